@@ -1,63 +1,25 @@
 # -*- coding: utf-8 -*-
+# Bibliotecas pesadas (plotly, wordcloud, openpyxl) são importadas sob demanda
+# pelos módulos que as usam, apenas quando a etapa correspondente roda.
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from PIL import Image
-import io
 from datetime import datetime
 import os
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import openpyxl
-import unicodedata
-import re
-from wordcloud import WordCloud
-
-# Função para remover acentos de uma string
-def remover_acentos(txt):
-    return ''.join(c for c in unicodedata.normalize('NFD', txt) if unicodedata.category(c) != 'Mn')
-
-# Função para tokenizar e contar as palavras (para gerar as frequências)
-def tokenize_and_count(series, stopwords):
-    """
-    Recebe uma Series (coluna de texto) e retorna um dicionário de frequências,
-    removendo stopwords, pontuação e acentos, e convertendo tudo para minúsculas.
-    """
-    freq = {}
-    for text in series.dropna():
-        # Converter para minúsculas
-        text = text.lower()
-        # Remover acentos
-        text = remover_acentos(text)
-        # Remover pontuação (mantém apenas letras e dígitos e espaços)
-        text = re.sub(r'[^a-z0-9\s]', '', text)
-        # Dividir em palavras
-        words = text.split()
-        # Contar palavras, ignorando stopwords
-        for w in words:
-            if w not in stopwords:
-                freq[w] = freq.get(w, 0) + 1
-    return freq
-
-# Stopwords personalizadas (acrescentamos "a", "há" e "o")
-stopwords = set(WordCloud().stopwords)
-stopwords.update([
-    "de", "da", "do", "que", "e", "com", "em", "as", "os", "à", "ao", "nas", "nos", "um", "uma",
-    "para", "dos", "das", "seu", "sua", "seus", "suas", "ele", "ela", "eles", "elas", "esta", "este",
-    "estes", "estas", "isto", "aquilo", "aquele", "aquela", "aqueles", "aquelas", "isso", "aquilo",
-    "entre", "sobre", "até", "sem", "com", "contra", "por", "perante", "desde", "trás", "sob",
-    "durante", "mediante", "exceto", "salvo", "fora", "após", "bem", "como", "mal", "assim",
-    "cada", "qual", "quais", "onde", "quando", "quanto", "quantos", "quantas", "tanto", "tantos", "tantas",
-    "nenhum", "nenhuma", "nenhuns", "nenhumas", "todo", "toda", "todos", "todas", "muitos", "muitas",
-    "poucos", "poucas", "algum", "alguma", "alguns", "algumas", "outro", "outra", "outros", "outras",
-    "mesmo", "mesma", "mesmos", "mesmas", "próprio", "própria", "próprios", "próprias", "tal", "tais",
-    "se", "mas", "pois", "porque", "portanto", "logo", "então", "nem", "contudo", "todavia", "entretanto",
-    "não", "sim", "ainda", "já", "apenas", "somente", "também", "muito", "pouco", "mais", "menos",
-    "quem", "cujo", "cuja", "cujos", "cujas",
-    "a", "há", "o"
-])
+from formatacao import formatador_moeda, formatar_moeda
+from execucao import Execucao
+from desempenho import ARQUIVO_LOG, historico, percentis, registrar, registro_execucao
+from graficos import TOP_N_PIZZA
+from agregacoes import em_cache, memoria_cache as memoria_derivados
+from carregamento import (estatisticas as estatisticas_cache, ligar_copy_on_write, memoria_cache as memoria_planilhas,
+                          relatorio_memoria)
+from frequencias import STOPWORDS, frequencias_selecionadas, indexar_tokens
+from pipeline import colunas_texto_problemas, preparar_resumo, preparar_servicos
+import vigilancia
+from tabelas import TAMANHO_PAGINA, TAMANHOS_PAGINA, estilo_estado, pagina, total_paginas
+from registro import carregar_campanhas, descobrir_campanhas, memoria_combinacoes
+from nuvem_palavras import (LIMITE_PALAVRAS, MAX_PALAVRAS, estatisticas as estatisticas_nuvens,
+                            memoria_cache as memoria_nuvens, renderizar_nuvem)
 
 # --------------------------------------------------
 # Configuração da Página e Cabeçalho
@@ -68,14 +30,21 @@ st.set_page_config(
     layout="wide"
 )
 
+# Pasta do script (logo) e raiz da árvore de planilhas das campanhas
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+PASTA_DADOS = os.environ.get("CAMFRIGO_DADOS", PASTA_APP)
+
+# As sessões recebem visões do armazém compartilhado: escritas nelas não podem alcançá-lo
+ligar_copy_on_write()
+
+# Uma única thread por processo vigia as planilhas e atualiza as sessões abertas
+if vigilancia.ATIVA:
+    vigilancia.iniciar(PASTA_DADOS, ao_alterar=vigilancia.reexecutar_sessoes)
+
 # Função para carregar o logo com fallback
 def load_colog_logo():
-    # Tenta carregar do caminho absoluto
-    logo_path = r"D:\GoogleDrive britointeb\IMAGENS\Logo_Colog_Sem_Fundo.png"
-    if os.path.exists(logo_path):
-        return Image.open(logo_path)
-    # Se não encontrar, tenta carregar do diretório local
-    local_logo = "Logo_Colog_Sem_Fundo.png"
+    # Tenta carregar da pasta do script
+    local_logo = os.path.join(PASTA_APP, "Logo_Colog_Sem_Fundo.png")
     if os.path.exists(local_logo):
         return Image.open(local_logo)
     # Se ainda não encontrar, cria uma imagem com um emoji de happy face
@@ -87,72 +56,76 @@ def load_colog_logo():
     except Exception:
         font = ImageFont.load_default()
     emoji_text = "😊"
-    text_width, text_height = draw.textsize(emoji_text, font=font)
+    # ImageDraw.textsize foi removido no Pillow 10; a largura e a altura saem da caixa do textbbox
+    esquerda, topo, direita, base = draw.textbbox((0, 0), emoji_text, font=font)
+    text_width, text_height = direita - esquerda, base - topo
     position = ((120 - text_width) // 2, (120 - text_height) // 2)
     draw.text(position, emoji_text, fill="black", font=font)
     return img
 
-# Função para converter valores para float
-def converter_valor_para_numero(valor_str):
-    if isinstance(valor_str, (int, float)):
-        return float(valor_str)
-    if isinstance(valor_str, str):
-        try:
-            valor_limpo = valor_str.replace("R$", "").strip().replace(".", "").replace(",", ".")
-            return float(valor_limpo)
-        except ValueError:
-            return 0.0
-    return 0.0
-
-# Função para formatar valores como moeda
-def formatar_moeda(valor):
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
 # --------------------------------------------------
 # Carregamento dos Arquivos Excel
 # --------------------------------------------------
-caminho_resumo = "TAB_VT_CAMFRIGO_16OM_RESUMO.xlsx"
-try:
-    df_resumo = pd.read_excel(caminho_resumo, engine='openpyxl')
-    st.sidebar.success(f"Arquivo {caminho_resumo} carregado com sucesso!")
-except Exception as e:
-    st.error(f"Erro ao carregar {caminho_resumo}: {e}")
-    df_resumo = pd.DataFrame()
-
-caminho_servicos = "TAB_VT_CAMFRIGO_16OM_SERVICOS.xlsx"
-try:
-    df_servicos = pd.read_excel(caminho_servicos, engine='openpyxl')
-    st.sidebar.success(f"Arquivo {caminho_servicos} carregado com sucesso!")
-except Exception as e:
-    st.error(f"Erro ao carregar {caminho_servicos}: {e}")
-    df_servicos = pd.DataFrame()
-
-caminho_problemas = "TAB_VT_CAMFRIGO_16OM_PRINCIPAIS_PROBLEMAS.xlsx"
-try:
-    df_problemas = pd.read_excel(caminho_problemas, engine='openpyxl')
-    st.sidebar.success(f"Arquivo {caminho_problemas} carregado com sucesso!")
-except Exception as e:
-    st.error(f"Erro ao carregar {caminho_problemas}: {e}")
-    df_problemas = pd.DataFrame()
-
-# Padronizar os nomes das colunas
-if not df_resumo.empty:
-    df_resumo.columns = [remover_acentos(col.strip().lower().replace(" ", "_")) for col in df_resumo.columns]
-    if "valor" not in df_resumo.columns:
-        if "valor_estimado" in df_resumo.columns:
-            df_resumo = df_resumo.rename(columns={"valor_estimado": "valor"})
-        else:
-            st.error("Coluna de valor não encontrada no arquivo de resumo.")
-if not df_servicos.empty:
-    df_servicos.columns = [remover_acentos(col.strip().lower().replace(" ", "_")) for col in df_servicos.columns]
-    if "valor" not in df_servicos.columns:
-        if "valor_estimado" in df_servicos.columns:
-            df_servicos = df_servicos.rename(columns={"valor_estimado": "valor"})
+if "cache_acertos" not in st.session_state:
+    st.session_state["cache_acertos"] = 0
+    st.session_state["cache_falhas"] = 0
+
+# As leituras rodam no pool de threads enquanto o cabeçalho é desenhado
+execucao_paralela = st.sidebar.checkbox("Execução paralela", value=True,
+                                        help="Desmarque para executar as etapas em sequência e comparar os tempos.")
+medir_memoria = st.sidebar.checkbox("Medir memória (tracemalloc)", value=False,
+                                    help="Registra o pico de memória por seção; deixa a execução mais lenta.")
+execucao = Execucao(paralelo=execucao_paralela, memoria=medir_memoria)
+execucao.iniciar_secao("Carregamento")
+
+def carregar_com_aviso(futuro):
+    df, relatorio = futuro.result()
+    for item in relatorio:
+        caminho = item["caminho"]
+        if caminho is None:
+            st.sidebar.info(f"Campanha {item['campanha']}: planilha não encontrada.")
+            continue
+        caminho = os.path.relpath(caminho, PASTA_DADOS)
+        if item["erro"] is not None:
+            st.error(f"Erro ao carregar {caminho}: {item['erro']}")
+            continue
+        if item["acerto"]:
+            st.session_state["cache_acertos"] += 1
         else:
-            st.error("Coluna de valor não encontrada no arquivo de serviços.")
-if not df_problemas.empty:
-    df_problemas.columns = [remover_acentos(col.strip().lower().replace(" ", "_")) for col in df_problemas.columns]
-    # As colunas para word clouds serão identificadas via busca de substring
+            st.session_state["cache_falhas"] += 1
+            st.sidebar.success(f"Arquivo {caminho} carregado com sucesso!")
+        falhas = item["valor_falhas"]
+        if falhas:
+            # Índice do DataFrame + 2 = linha na planilha (cabeçalho na linha 1)
+            linhas = ", ".join(str(i + 2) for i in falhas[:20])
+            if len(falhas) > 20:
+                linhas += ", ..."
+            st.sidebar.warning(f"{caminho}: {len(falhas)} valor(es) não reconhecido(s), considerados R$ 0,00 "
+                               f"(linhas {linhas}).")
+    return df
+
+# Planilhas recarregadas pela vigilância desde o rerun anterior desta sessão
+alteracoes = vigilancia.alteracoes_recentes(desde=st.session_state.get("alteracoes_vistas"))
+if alteracoes:
+    if "alteracoes_vistas" in st.session_state:
+        for alteracao in alteracoes:
+            st.sidebar.info(f"Planilha {os.path.relpath(alteracao['caminho'], PASTA_DADOS)} "
+                            f"{alteracao['evento']} às {datetime.fromtimestamp(alteracao['instante']):%H:%M:%S}; "
+                            "só as seções que dependem dela foram recalculadas.")
+    st.session_state["alteracoes_vistas"] = alteracoes[-1]["instante"]
+else:
+    st.session_state.setdefault("alteracoes_vistas", 0.0)
+
+# Campanhas descobertas na árvore de dados; só as selecionadas são lidas
+campanhas = descobrir_campanhas(PASTA_DADOS)
+if not campanhas:
+    st.warning(f"Nenhuma planilha TAB_VT_CAMFRIGO_* encontrada em {PASTA_DADOS}.")
+campanhas_selecionadas = st.sidebar.multiselect("Campanhas de vistoria", options=list(campanhas),
+                                                default=list(campanhas)[:1])
+futuros_planilhas = {
+    tipo: execucao.submeter(f"Leitura ({tipo})", carregar_campanhas, campanhas, campanhas_selecionadas, tipo)
+    for tipo in ("resumo", "servicos", "problemas")
+}
 
 # --------------------------------------------------
 # Cabeçalho do Dashboard
@@ -178,46 +151,89 @@ with col2_header:
         data_atual_str = datetime.now().strftime("%d/%m/%Y")
     st.caption(f"Data do Relatório: {data_atual_str}")
 
-# Função de destaque para a coluna ESTADO GERAL
-def highlight_estado(val):
-    if val == "Precário":
-        return 'background-color: red; color: white'
-    elif val == "Bom":
-        return 'background-color: green; color: white'
-    elif val == "Ruim":
-        return 'background-color: yellow; color: black'
-    return ''
+df_resumo = carregar_com_aviso(futuros_planilhas["resumo"])
+df_servicos = carregar_com_aviso(futuros_planilhas["servicos"])
+df_problemas = carregar_com_aviso(futuros_planilhas["problemas"])
+
+# Os nomes das colunas já chegam padronizados e a coluna "valor" já convertida para float
+if not df_resumo.empty and "valor" not in df_resumo.columns:
+    st.error("Coluna de valor não encontrada no arquivo de resumo.")
+if not df_servicos.empty and "valor" not in df_servicos.columns:
+    st.error("Coluna de valor não encontrada no arquivo de serviços.")
+
+# Colunas de texto das word clouds: a primeira que contenha "problema"/"defeito" e "solucao"/"solucoes"
+col_def, col_sol = colunas_texto_problemas(df_problemas)
+
+# --------------------------------------------------
+# Etapas pesadas das seções, agendadas em paralelo
+# --------------------------------------------------
+fatias_pizza = st.sidebar.slider("Fatias por gráfico de pizza (demais em \"Outros\")", min_value=3,
+                                 max_value=40, value=TOP_N_PIZZA)
+metricas_graficos = {}
+futuro_resumo = None
+if not df_resumo.empty and "solucao_proposta" in df_resumo.columns:
+    futuro_resumo = execucao.submeter("Agregação e gráficos (Resumo)", preparar_resumo, df_resumo, fatias_pizza)
+futuro_servicos = None
+if not df_servicos.empty:
+    futuro_servicos = execucao.submeter("Agregação e gráficos (Serviços)", preparar_servicos, df_servicos,
+                                        fatias_pizza)
+futuros_indices = {
+    col: execucao.submeter(f"Índice de palavras ({col})", indexar_tokens, df_problemas, col)
+    for col in (col_def, col_sol) if col
+}
+
+# Tabela paginada: ordenação no servidor e só a página visível é estilizada e enviada.
+# `linhas` são as posições que passaram no filtro da sessão (None: todas).
+def exibir_tabela_paginada(df, chave, renomear=None, estilizar=None, linhas=None):
+    renomear = renomear or {}
+    n_linhas = len(df) if linhas is None else len(linhas)
+    sem_ordem = "(ordem da planilha)"
+    col_ordem, col_sentido, col_tamanho, col_pagina = st.columns([3, 1, 1, 1])
+    ordenar_por = col_ordem.selectbox("Ordenar por", [sem_ordem] + list(df.columns),
+                                      format_func=lambda c: renomear.get(c, c), key=f"{chave}_ordem")
+    decrescente = col_sentido.checkbox("Decrescente", key=f"{chave}_decrescente")
+    tamanho = col_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA,
+                                    index=TAMANHOS_PAGINA.index(TAMANHO_PAGINA), key=f"{chave}_tamanho")
+    n_paginas = total_paginas(n_linhas, tamanho)
+    # O valor do widget vive só no session_state (o Streamlit avisa quando `value=`
+    # e a chave são definidos juntos); o filtro pode ter reduzido o número de páginas
+    chave_pagina = f"{chave}_pagina"
+    if st.session_state.setdefault(chave_pagina, 1) > n_paginas:
+        st.session_state[chave_pagina] = n_paginas
+    numero = col_pagina.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas,
+                                     step=1, key=chave_pagina)
+    visivel = pagina(df, numero, tamanho, None if ordenar_por == sem_ordem else ordenar_por, not decrescente,
+                     linhas)
+    if visivel.empty:
+        st.caption("Nenhuma linha para exibir.")
+    else:
+        inicio = (numero - 1) * tamanho
+        st.caption(f"Linhas {inicio + 1}–{inicio + len(visivel)} de {n_linhas}")
+    visivel = visivel.rename(columns=renomear)
+    st.dataframe(estilizar(visivel) if estilizar else visivel, use_container_width=True)
 
 # ==================================================
 # SEÇÃO 1 – DASHBOARD RESUMO (TAB_VT_CAMFRIGO_16OM_RESUMO)
 # ==================================================
-st.header("Resumo e Análise – 16 OMs (Resumo)")
+execucao.iniciar_secao("Resumo")
+n_oms_resumo = df_resumo["om"].nunique() if "om" in df_resumo.columns else 0
+st.header(f"Resumo e Análise – {n_oms_resumo} OMs (Resumo)")
 
 if df_resumo.empty:
     st.info("Arquivo de resumo não contém dados.")
+elif "solucao_proposta" not in df_resumo.columns:
+    st.error("Coluna 'solucao_proposta' não encontrada no arquivo de resumo.")
 else:
-    df_resumo["valor"] = df_resumo["valor"].apply(converter_valor_para_numero)
-    
-    total_geral = df_resumo["valor"].sum()
-    media_geral = df_resumo["valor"].mean()
-    min_geral = df_resumo["valor"].min()
-    max_geral = df_resumo["valor"].max()
-
-    if "solucao_proposta" in df_resumo.columns:
-        resumo_solucao = df_resumo.groupby("solucao_proposta").agg(
-            total=("valor", "sum"),
-            media=("valor", "mean"),
-            minimo=("valor", "min"),
-            maximo=("valor", "max"),
-            quantidade=("valor", "count")
-        ).reset_index()
-        resumo_solucao["total"] = resumo_solucao["total"].apply(formatar_moeda)
-        resumo_solucao["media"] = resumo_solucao["media"].apply(formatar_moeda)
-        resumo_solucao["minimo"] = resumo_solucao["minimo"].apply(lambda x: f"{formatar_moeda(x)} ⬇️")
-        resumo_solucao["maximo"] = resumo_solucao["maximo"].apply(lambda x: f"{formatar_moeda(x)} ⬆️")
-    else:
-        st.error("Coluna 'solucao_proposta' não encontrada no arquivo de resumo.")
-        resumo_solucao = pd.DataFrame()
+    # Todos os indicadores e gráficos da seção leem do mesmo cubo de agregação
+    with st.spinner("Calculando indicadores do resumo..."):
+        agregados_resumo, (figs_resumo, metricas_graficos["Resumo"]) = futuro_resumo.result()
+    total_geral = agregados_resumo["geral"]["total"]
+    media_geral = agregados_resumo["geral"]["media"]
+    min_geral = agregados_resumo["geral"]["minimo"]
+    max_geral = agregados_resumo["geral"]["maximo"]
+    resumo_solucao = agregados_resumo["por_solucao"][
+        ["solucao_proposta", "total", "media", "minimo", "maximo", "quantidade"]
+    ]
     
     st.subheader("Indicadores Gerais")
     col1_ind, col2_ind, col3_ind, col4_ind = st.columns(4)
@@ -227,127 +243,88 @@ else:
     col4_ind.metric("Máximo Geral", formatar_moeda(max_geral))
     
     st.subheader("Indicadores por Solução")
-    st.dataframe(resumo_solucao.rename(columns={
+    # As colunas continuam numéricas (ordenáveis); a moeda é aplicada só na exibição
+    tabela_solucao = resumo_solucao.rename(columns={
         "solucao_proposta": "Solução",
         "total": "Total",
         "media": "Média",
         "minimo": "Mínimo",
         "maximo": "Máximo",
         "quantidade": "Quantidade"
-    }))
+    })
+    if not tabela_solucao.empty:
+        tabela_solucao = tabela_solucao.style.format({
+            "Total": formatador_moeda(),
+            "Média": formatador_moeda(),
+            "Mínimo": formatador_moeda("⬇️"),
+            "Máximo": formatador_moeda("⬆️")
+        })
+    st.dataframe(tabela_solucao)
     
     st.subheader("Tabela Detalhada dos Dados (Resumo)")
-    df_display = df_resumo.copy().rename(columns={
+    def estilizar_resumo(visivel):
+        estilo = visivel.style.format({"VALOR ESTIMADO": formatador_moeda()})
+        if "ESTADO GERAL" in visivel.columns:
+            estilo = estilo.apply(estilo_estado, subset=["ESTADO GERAL"])
+        return estilo
+    exibir_tabela_paginada(df_resumo, "tabela_resumo", renomear={
         "om": "OM",
         "estado_geral": "ESTADO GERAL",
         "solucao_proposta": "SOLUÇÃO PROPOSTA",
         "valor": "VALOR ESTIMADO",
         "nr_opus": "NR OPUS"
-    })
-    st.dataframe(
-        df_display.style.applymap(highlight_estado, subset=['ESTADO GERAL']),
-        use_container_width=True
-    )
+    }, estilizar=estilizar_resumo)
     
     col1_pizza, col2_pizza = st.columns(2)
     with col1_pizza:
         st.subheader("Quantidade por OM")
-        contagem_om = df_resumo["om"].value_counts().reset_index()
-        contagem_om.columns = ["om", "quantidade"]
-        if not contagem_om.empty:
-            fig_qtd_om = px.pie(contagem_om, values="quantidade", names="om",
-                                title="Distribuição de Quantidade por OM", hole=0.3)
-            fig_qtd_om.update_traces(textinfo='percent+label', pull=[0.05]*len(contagem_om))
-            st.plotly_chart(fig_qtd_om, use_container_width=True)
+        if figs_resumo["qtd_om"] is not None:
+            st.plotly_chart(figs_resumo["qtd_om"], use_container_width=True)
     with col2_pizza:
         st.subheader("Quantidade por Solução")
-        contagem_sol = df_resumo["solucao_proposta"].value_counts().reset_index()
-        contagem_sol.columns = ["solucao", "quantidade"]
-        if not contagem_sol.empty:
-            fig_qtd_sol = px.pie(contagem_sol, values="quantidade", names="solucao",
-                                 title="Distribuição de Quantidade por Solução", hole=0.3)
-            fig_qtd_sol.update_traces(textinfo='percent+label', pull=[0.05]*len(contagem_sol))
-            st.plotly_chart(fig_qtd_sol, use_container_width=True)
+        if figs_resumo["qtd_sol"] is not None:
+            st.plotly_chart(figs_resumo["qtd_sol"], use_container_width=True)
     
     col3_pizza, col4_pizza = st.columns(2)
     with col3_pizza:
         st.subheader("Valor por OM")
-        valor_om = df_resumo.groupby("om")["valor"].sum().reset_index()
-        if not valor_om.empty:
-            fig_val_om = px.pie(valor_om, values="valor", names="om",
-                                title="Distribuição de Valor por OM", hole=0.3)
-            fig_val_om.update_traces(textinfo='percent+label', pull=[0.05]*len(valor_om))
-            st.plotly_chart(fig_val_om, use_container_width=True)
+        if figs_resumo["val_om"] is not None:
+            st.plotly_chart(figs_resumo["val_om"], use_container_width=True)
     with col4_pizza:
         st.subheader("Valor por Solução")
-        valor_sol = df_resumo.groupby("solucao_proposta")["valor"].sum().reset_index()
-        if not valor_sol.empty:
-            fig_val_sol = px.pie(valor_sol, values="valor", names="solucao_proposta",
-                                 title="Distribuição de Valor por Solução", hole=0.3)
-            fig_val_sol.update_traces(textinfo='percent+label', pull=[0.05]*len(valor_sol))
-            st.plotly_chart(fig_val_sol, use_container_width=True)
+        if figs_resumo["val_sol"] is not None:
+            st.plotly_chart(figs_resumo["val_sol"], use_container_width=True)
     
     st.subheader("Valor por OM (por Solução)")
-    df_om_val = df_resumo.groupby(["om", "solucao_proposta"])["valor"].sum().reset_index()
-    if not df_om_val.empty:
-        df_om_val = df_om_val.sort_values("valor", ascending=True)
-        # Gerar dicionário de cores com base nas soluções únicas
-        unique_sols = sorted(df_om_val["solucao_proposta"].unique())
-        cores_sol = {sol: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)]
-                     for i, sol in enumerate(unique_sols)}
-        df_om_val["cor"] = df_om_val["solucao_proposta"].apply(lambda s: cores_sol.get(s, "#808080"))
-        fig_bar = go.Figure()
-        fig_bar.add_trace(go.Bar(
-            y=df_om_val["om"],
-            x=df_om_val["valor"],
-            orientation='h',
-            marker_color=df_om_val["cor"],
-            text=df_om_val["valor"].apply(formatar_moeda),
-            textposition="auto",
-            hovertemplate="OM: %{y}<br>Valor: %{x:.2f}<extra></extra>"
-        ))
-        fig_bar.add_vline(x=media_geral, line_dash="dash", line_color="red",
-                          annotation_text=f"Média Geral: {formatar_moeda(media_geral)}",
-                          annotation_position="bottom right")
-        fig_bar.update_layout(
-            xaxis_title="Valor (R$)",
-            yaxis_title="OM",
-            height=max(400, len(df_om_val)*30)
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+    if figs_resumo["barras"] is not None:
+        st.plotly_chart(figs_resumo["barras"], use_container_width=True)
     else:
         st.info("Não há dados para o gráfico de barras.")
 
 # ==================================================
 # SEÇÃO 2 – DASHBOARD SERVIÇOS (TAB_VT_CAMFRIGO_16OM_SERVICOS)
 # ==================================================
-st.header("Análise de Serviços – 16 OMs (Serviços)")
+execucao.iniciar_secao("Serviços")
+n_oms_servicos = df_servicos["om"].nunique() if "om" in df_servicos.columns else 0
+st.header(f"Análise de Serviços – {n_oms_servicos} OMs (Serviços)")
 
 if df_servicos.empty:
     st.info("Arquivo de serviços não contém dados.")
 else:
-    # Excluir disciplinas "total" e "total com bdi"
-    df_servicos_filtered = df_servicos[~df_servicos["disciplina"].str.strip().str.lower().isin(["total", "total com bdi"])]
-    df_servicos_filtered["valor"] = df_servicos_filtered["valor"].apply(converter_valor_para_numero)
+    # Agregados sem as disciplinas "total" e "total com bdi", em um único groupby
+    with st.spinner("Calculando indicadores dos serviços..."):
+        agregados_servicos, (figs_servicos, metricas_graficos["Serviços"]) = futuro_servicos.result()
     
     st.subheader("Indicadores por Disciplina")
-    total_geral_servicos = df_servicos_filtered["valor"].sum()
-    disciplinas = df_servicos_filtered["disciplina"].unique()
-    for disc in disciplinas:
-        st.markdown(f"**{disc}**")
-        df_temp = df_servicos_filtered[df_servicos_filtered["disciplina"] == disc]
-        total_val = df_temp["valor"].sum()
+    total_geral_servicos = agregados_servicos["geral"]["total"]
+    for linha in agregados_servicos["por_disciplina"].itertuples(index=False):
+        st.markdown(f"**{linha.disciplina}**")
+        total_val = linha.total
         perc = (total_val / total_geral_servicos * 100) if total_geral_servicos > 0 else 0
-        min_val = df_temp["valor"].min()
-        max_val = df_temp["valor"].max()
-        if not df_temp.empty:
-            idx_min = df_temp["valor"].idxmin()
-            idx_max = df_temp["valor"].idxmax()
-            om_min = df_temp.loc[idx_min, "om"]
-            om_max = df_temp.loc[idx_max, "om"]
-        else:
-            om_min = ""
-            om_max = ""
+        min_val = linha.minimo
+        max_val = linha.maximo
+        om_min = linha.om_minimo
+        om_max = linha.om_maximo
         colA, colB, colC = st.columns(3)
         colA.metric("Total", f"{formatar_moeda(total_val)} ({perc:.1f}%)")
         colB.metric(f"Mínimo ({om_min})", f"{formatar_moeda(min_val)} ⬇️")
@@ -355,29 +332,19 @@ else:
         st.markdown("---")
     
     st.subheader("Distribuição de Valor por Disciplina")
-    valor_disc = df_servicos_filtered.groupby("disciplina")["valor"].sum().reset_index()
-    if not valor_disc.empty:
-        fig_pizza_serv = px.pie(valor_disc, values="valor", names="disciplina",
-                                title="Valor Total por Disciplina", hole=0.3)
-        fig_pizza_serv.update_traces(textinfo='percent+label', pull=[0.05]*len(valor_disc))
-        st.plotly_chart(fig_pizza_serv, use_container_width=True)
+    if figs_servicos["pizza_disciplina"] is not None:
+        st.plotly_chart(figs_servicos["pizza_disciplina"], use_container_width=True)
     
     st.subheader("Valor por OM (Segmentado por Disciplina)")
-    om_disc = df_servicos_filtered.groupby(["om", "disciplina"])["valor"].sum().reset_index()
-    if not om_disc.empty:
-        fig_bar_serv = px.bar(om_disc, x="valor", y="om", color="disciplina",
-                              orientation="h",
-                              title="Valor por OM Segmentado por Disciplina",
-                              labels={"valor": "Valor (R$)", "om": "OM", "disciplina": "Disciplina"},
-                              barmode="stack")
-        fig_bar_serv.update_layout(xaxis_tickformat=',.2f')
-        st.plotly_chart(fig_bar_serv, use_container_width=True)
+    if figs_servicos["barras"] is not None:
+        st.plotly_chart(figs_servicos["barras"], use_container_width=True)
     else:
         st.info("Não há dados para o gráfico de serviços.")
 
 # ==================================================
 # NOVA SEÇÃO – ANÁLISE DOS PRINCIPAIS PROBLEMAS
 # ==================================================
+execucao.iniciar_secao("Principais Problemas")
 st.header("Análise dos Principais Problemas")
 
 if df_problemas.empty:
@@ -387,26 +354,37 @@ else:
     if "om" in df_problemas.columns:
         oms_problemas = sorted(df_problemas["om"].unique())
         selected_oms_problemas = st.multiselect("Filtrar Problemas por OM", options=oms_problemas, default=oms_problemas)
-        df_problemas_filtrado = df_problemas[df_problemas["om"].isin(selected_oms_problemas)]
+        # A sessão guarda só as posições filtradas; a planilha compartilhada não é copiada
+        linhas_problemas = None
+        if len(selected_oms_problemas) != len(oms_problemas):
+            linhas_problemas = np.flatnonzero(df_problemas["om"].isin(selected_oms_problemas).to_numpy())
     else:
-        df_problemas_filtrado = df_problemas
+        selected_oms_problemas = None  # sem coluna "om": considera todas as linhas
+        linhas_problemas = None
 
     st.subheader("Tabela dos Principais Problemas")
-    st.dataframe(df_problemas_filtrado)
+    exibir_tabela_paginada(df_problemas, "tabela_problemas", linhas=linhas_problemas)
+
+    # Limita o tempo de layout das word clouds quando há muitas OMs/palavras
+    max_palavras_nuvem = st.sidebar.slider("Máximo de palavras nas word clouds", min_value=20,
+                                           max_value=LIMITE_PALAVRAS, value=MAX_PALAVRAS, step=10)
     
+    # Contagens pré-computadas por OM; o filtro só soma as OMs selecionadas.
+    # As duas word clouds são renderizadas em paralelo antes de serem exibidas.
+    futuros_nuvens = {}
+    for col in (col_def, col_sol):
+        if col:
+            freq = frequencias_selecionadas(futuros_indices[col].result(), selected_oms_problemas, STOPWORDS)
+            if freq:
+                futuros_nuvens[col] = execucao.submeter(f"Word cloud ({col})", renderizar_nuvem, freq,
+                                                        max_palavras=max_palavras_nuvem)
+
     # Word Cloud para Frequência de Defeitos usando a coluna que contenha "problema" ou "defeito"
     st.subheader("Word Cloud - Frequência de Defeitos")
-    col_def = None
-    for col in df_problemas_filtrado.columns:
-        if "problema" in col.lower() or "defeito" in col.lower():
-            col_def = col
-            break
     if col_def:
-        freq_defeitos = tokenize_and_count(df_problemas_filtrado[col_def], stopwords)
-        if freq_defeitos:
-            wc_defeitos = WordCloud(width=800, height=400, background_color='white', stopwords=stopwords)\
-                .generate_from_frequencies(freq_defeitos)
-            st.image(wc_defeitos.to_array(), use_column_width=True)
+        if col_def in futuros_nuvens:
+            with st.spinner("Gerando word cloud de defeitos..."):
+                st.image(futuros_nuvens[col_def].result(), use_column_width=True)
         else:
             st.info("Não há dados para gerar a word cloud de defeitos.")
     else:
@@ -414,22 +392,17 @@ else:
     
     # Word Cloud para Distribuição de Soluções usando a coluna que contenha "solucao" ou "solucoes"
     st.subheader("Word Cloud - Distribuição de Soluções")
-    col_sol = None
-    for col in df_problemas_filtrado.columns:
-        if "solucao" in col.lower() or "solucoes" in col.lower():
-            col_sol = col
-            break
     if col_sol:
-        freq_solucoes = tokenize_and_count(df_problemas_filtrado[col_sol], stopwords)
-        if freq_solucoes:
-            wc_solucoes = WordCloud(width=800, height=400, background_color='white', stopwords=stopwords)\
-                .generate_from_frequencies(freq_solucoes)
-            st.image(wc_solucoes.to_array(), use_column_width=True)
+        if col_sol in futuros_nuvens:
+            with st.spinner("Gerando word cloud de soluções..."):
+                st.image(futuros_nuvens[col_sol].result(), use_column_width=True)
         else:
             st.info("Não há dados para gerar a word cloud de soluções.")
     else:
         st.info("Nenhuma coluna que contenha 'solucao' encontrada.")
 
+execucao.encerrar()
+
 # ==================================================
 # Rodapé e Instruções Finais
 # ==================================================
@@ -441,15 +414,90 @@ st.sidebar.markdown('---')
 st.sidebar.markdown("""
 #### Instruções de Uso
 - Este dashboard integra dados dos arquivos de resumo, serviços e principais problemas.
-- Na seção “Resumo e Análise – 16 OMs (Resumo)” são exibidos indicadores gerais e por solução, uma tabela detalhada (com nomes originais e coloração do ESTADO GERAL) e gráficos de distribuição (pizza e barras).
-- Na seção “Análise de Serviços – 16 OMs (Serviços)” são apresentados indicadores e gráficos relacionados aos serviços por disciplina. Nos indicadores por disciplina, o Total exibe o valor e sua porcentagem do total geral.
+- Na seção “Resumo e Análise (Resumo)” são exibidos indicadores gerais e por solução, uma tabela detalhada (com nomes originais e coloração do ESTADO GERAL) e gráficos de distribuição (pizza e barras).
+- Na seção “Análise de Serviços (Serviços)” são apresentados indicadores e gráficos relacionados aos serviços por disciplina. Nos indicadores por disciplina, o Total exibe o valor e sua porcentagem do total geral.
 - Na seção “Análise dos Principais Problemas”, utilize o filtro por OM para visualizar a tabela dos problemas e as word clouds (a primeira word cloud utiliza uma coluna que contenha 'problema' ou 'defeito', e a segunda uma que contenha 'solucao').
-- Todos os arquivos devem estar na mesma pasta do script.
+- As planilhas são procuradas na pasta do script (ou em CAMFRIGO_DADOS) e subpastas, com nomes TAB_VT_CAMFRIGO_<campanha>_RESUMO/SERVICOS/PRINCIPAIS_PROBLEMAS.xlsx. Selecione uma ou mais campanhas na barra lateral; com várias, cada OM aparece como “campanha | OM”.
+- Para acelerar a primeira carga, gere os snapshots colunares com `python snapshots.py` (são regerados automaticamente quando a planilha for mais nova).
+- Para gerar o relatório em HTML/PDF sem abrir o dashboard, use `python exportacao.py` (com `--por-om`, também um relatório por OM).
+- Planilhas alteradas na pasta de dados são relidas automaticamente e o dashboard é atualizado em todas as sessões abertas (desative com CAMFRIGO_VIGIAR=0).
 """)
 st.sidebar.markdown(f"""
 #### Informações sobre os Dados
-- Arquivo de Resumo: **{caminho_resumo}**
-- Arquivo de Serviços: **{caminho_servicos}**
-- Arquivo de Principais Problemas: **{caminho_problemas}**
+- Pasta de dados: **{PASTA_DADOS}**
+- Campanhas disponíveis: {len(campanhas)}
+- Campanhas selecionadas: **{", ".join(campanhas_selecionadas) or "nenhuma"}**
 - Última atualização: {data_atual_str}
 """)
+st.sidebar.markdown(f"""
+#### Cache das Planilhas
+- Sessão: {st.session_state["cache_acertos"]} acertos / {st.session_state["cache_falhas"]} leituras do disco
+- Processo: {estatisticas_cache["acertos"]} acertos / {estatisticas_cache["falhas"]} leituras do disco
+
+#### Cache das Word Clouds
+- {estatisticas_nuvens["acertos_memoria"]} acertos em memória / {estatisticas_nuvens["acertos_disco"]} em disco / {estatisticas_nuvens["renderizacoes"]} renderizações
+""")
+# Memória de cada planilha (calculada uma vez por versão)
+linhas_memoria = []
+for nome, df in (("Resumo", df_resumo), ("Serviços", df_servicos), ("Principais Problemas", df_problemas)):
+    if df.empty:
+        continue
+    memoria = em_cache(df, "memoria", relatorio_memoria)
+    maiores = ", ".join(f"{col} ({dtype}) {n_bytes / 1024:.0f} KB"
+                        for col, (dtype, n_bytes) in list(memoria["colunas"].items())[:3])
+    linhas_memoria.append(f"- {nome}: **{memoria['total'] / 1024:.0f} KB** em {len(df)} linhas — {maiores}")
+st.sidebar.markdown("#### Memória das Planilhas\n" + ("\n".join(linhas_memoria) or "- Nenhuma planilha carregada"))
+# Tudo o que é derivado das planilhas fica uma única vez no processo, para todas as sessões
+linhas_armazem = []
+for nome, (itens, n_bytes) in (("Planilhas", memoria_planilhas()), ("Combinações de campanhas", memoria_combinacoes()),
+                               ("Agregados e índices", memoria_derivados()), ("Word clouds", memoria_nuvens())):
+    linhas_armazem.append(f"- {nome}: {itens} em cache, {n_bytes / 2**20:.1f} MB")
+st.sidebar.markdown("#### Armazém Compartilhado (todas as sessões)\n" + "\n".join(linhas_armazem))
+# Gráficos construídos antes do início deste rerun vieram do cache de figuras
+linhas_graficos = []
+bytes_graficos = 0
+for secao, metricas in metricas_graficos.items():
+    for nome, m in metricas.items():
+        if m["bytes"]:
+            bytes_graficos += m["bytes"]
+            origem = "cache" if m["instante"] < execucao.inicio else f"{m['tempo'] * 1000:.0f} ms"
+            linhas_graficos.append(f"- {secao} / {nome}: {m['bytes'] / 1024:.1f} KB ({origem})")
+st.sidebar.markdown(f"""
+#### Gráficos
+- JSON enviado neste rerun: **{bytes_graficos / 1024:.1f} KB**
+
+""" + "\n".join(linhas_graficos))
+# Registro do rerun (histórico do processo e log JSON lines opcional)
+registro_rerun = registro_execucao(execucao)
+registrar(registro_rerun)
+
+def _mb(n_bytes):
+    return f"{n_bytes / 2**20:.1f} MB"
+
+linhas_desempenho = [
+    f"**Execução {'paralela' if execucao.paralelo else 'serial'}**",
+    f"- Tempo total (parede): **{registro_rerun['total'] * 1000:.0f} ms**",
+    f"- Soma das tarefas (equivalente serial): {registro_rerun['serial'] * 1000:.0f} ms",
+]
+p_total = percentis(historico())
+if p_total:
+    linhas_desempenho.append(f"- p50 {p_total[0] * 1000:.0f} ms / p95 {p_total[1] * 1000:.0f} ms "
+                             f"({p_total[2]} reruns)")
+if execucao.pico_memoria is not None:
+    linhas_desempenho.append(f"- Pico de memória (tracemalloc): **{_mb(execucao.pico_memoria)}**")
+elif execucao.memoria_ocupada:
+    linhas_desempenho.append("- Memória não medida: outra sessão está medindo neste momento")
+linhas_desempenho += ["", "**Por seção**"]
+for nome, tempo in execucao.tempos_secoes.items():
+    memoria = f", pico {_mb(execucao.memoria_secoes[nome])}" if nome in execucao.memoria_secoes else ""
+    linhas_desempenho.append(f"- {nome}: {tempo * 1000:.0f} ms{memoria}")
+linhas_desempenho += ["", "**Por tarefa**"]
+for nome, tempo in execucao.tempos_tarefas.items():
+    memoria = f", pico {_mb(execucao.memoria_tarefas[nome])}" if nome in execucao.memoria_tarefas else ""
+    linhas_desempenho.append(f"- {nome}: {tempo * 1000:.0f} ms{memoria}")
+    for etapa_nome, tempo_etapa in execucao.etapas_tarefas.get(nome, []):
+        linhas_desempenho.append(f"    - {etapa_nome}: {tempo_etapa * 1000:.0f} ms")
+with st.sidebar.expander("Desempenho"):
+    st.markdown("\n".join(linhas_desempenho))
+    if ARQUIVO_LOG:
+        st.caption(f"Registros gravados em {ARQUIVO_LOG} (resumo: python desempenho.py).")
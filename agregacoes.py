@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de agregação das seções Resumo e Serviços.
+
+Cada planilha passa por um único groupby que produz o "cubo" de células
+(om, solucao_proposta) ou (om, disciplina) com soma, contagem, mínimo,
+máximo e a linha de origem do mínimo/máximo. Indicadores gerais, tabelas
+por solução/disciplina e os dados dos gráficos são reduções desse cubo,
+que tem no máximo OMs × categorias linhas.
+
+Os cubos são guardados em cache pela versão da planilha (df.attrs["versao"],
+definida por carregamento.carregar_planilha); os DataFrames devolvidos são
+compartilhados e devem ser tratados como somente leitura.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from execucao import etapa
+
+# Disciplinas de totalização presentes na planilha de serviços
+DISCIPLINAS_TOTAL = ["total", "total com bdi"]
+
+# (versao, tipo) -> resultado derivado da planilha (cubos, índices, figuras etc.),
+# em ordem de uso (LRU) e limitado a LIMITE_CACHE entradas
+_cache = OrderedDict()
+_trava = threading.Lock()
+LIMITE_CACHE = 32
+
+
+def _cubo(df, chaves):
+    """Único groupby sobre as chaves; células com chave nula são mantidas."""
+    with etapa("groupby " + "/".join(chaves)):
+        return _agrupar(df, chaves)
+
+
+def _agrupar(df, chaves):
+    return df.groupby(chaves, observed=True, dropna=False, sort=True).agg(
+        total=("valor", "sum"),
+        quantidade=("valor", "count"),
+        linhas=("valor", "size"),
+        minimo=("valor", "min"),
+        maximo=("valor", "max"),
+        pos_minimo=("valor", "idxmin"),
+        pos_maximo=("valor", "idxmax"),
+    ).reset_index()
+
+
+def _reduzir(cubo, chave):
+    """
+    Reduz o cubo para uma única chave. Células com a chave nula são descartadas,
+    como no groupby padrão do pandas.
+    """
+    celulas = cubo[cubo[chave].notna()]
+    grupos = celulas.groupby(chave, observed=True, sort=True)
+    reduzido = grupos.agg(
+        total=("total", "sum"),
+        quantidade=("quantidade", "sum"),
+        linhas=("linhas", "sum"),
+        minimo=("minimo", "min"),
+        maximo=("maximo", "max"),
+    )
+    reduzido["media"] = reduzido["total"] / reduzido["quantidade"].replace(0, np.nan)
+    # OM da linha de menor/maior valor; empates vão para a primeira linha da planilha
+    for extremo, ordem in (("minimo", True), ("maximo", False)):
+        pos = "pos_" + extremo
+        melhores = (celulas.dropna(subset=[extremo])
+                    .sort_values([chave, extremo, pos], ascending=[True, ordem, True])
+                    .drop_duplicates(chave))
+        om_extremo = pd.Series(melhores["om"].to_numpy(dtype=object), index=melhores[chave].to_numpy(dtype=object))
+        reduzido["om_" + extremo] = om_extremo.reindex(reduzido.index.astype(object)).to_numpy()
+    return reduzido.reset_index()
+
+
+def _geral(cubo):
+    total = cubo["total"].sum()
+    quantidade = cubo["quantidade"].sum()
+    return {
+        "total": total,
+        "media": total / quantidade if quantidade else np.nan,
+        "minimo": cubo["minimo"].min(),
+        "maximo": cubo["maximo"].max(),
+    }
+
+
+def em_cache(df, tipo, calcular):
+    """
+    Retorna calcular(df), reaproveitando o resultado enquanto a versão da
+    planilha (df.attrs["versao"]) não mudar. `tipo` distingue os resultados
+    derivados de uma mesma planilha.
+    """
+    versao = df.attrs.get("versao")
+    if versao is None:
+        return calcular(df)
+    chave = (versao, tipo)
+    with _trava:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave]
+    resultado = calcular(df)
+    with _trava:
+        _cache[chave] = resultado
+        _cache.move_to_end(chave)
+        # As variantes de figuras (por top_n) não expulsam os cubos ainda em uso
+        while len(_cache) > LIMITE_CACHE:
+            _cache.popitem(last=False)
+    return resultado
+
+
+def invalidar(versao):
+    """
+    Descarta todos os resultados derivados da versão de planilha indicada
+    (agregados, figuras, índices de palavras etc.). Devolve quantos saíram.
+    """
+    with _trava:
+        chaves = [chave for chave in _cache if chave[0] == versao]
+        for chave in chaves:
+            del _cache[chave]
+    return len(chaves)
+
+
+def _bytes(valor):
+    """Memória dos DataFrames e arrays contidos em um resultado do cache."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sum(_bytes(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sum(_bytes(v) for v in valor)
+    return 0
+
+
+def memoria_cache():
+    """
+    (resultados, bytes) do cache de derivados; só DataFrames e arrays entram
+    na soma (figuras e contadores de palavras não são medidos).
+    """
+    with _trava:
+        resultados = list(_cache.values())
+    return len(resultados), sum(_bytes(r) for r in resultados)
+
+
+def _calcular_resumo(df):
+    cubo = _cubo(df, ["om", "solucao_proposta"])
+    por_om = _reduzir(cubo, "om")
+    por_solucao = _reduzir(cubo, "solucao_proposta")
+    return {
+        "cubo": cubo,
+        "geral": _geral(cubo),
+        "por_om": por_om,
+        "por_solucao": por_solucao,
+    }
+
+
+def agregar_resumo(df_resumo):
+    """
+    Agregados da planilha de resumo:
+      - "cubo": por (om, solucao_proposta)
+      - "geral": total/media/minimo/maximo de todas as linhas
+      - "por_om" e "por_solucao": total, quantidade, linhas, minimo, maximo,
+        media, om_minimo e om_maximo
+    """
+    return em_cache(df_resumo, "resumo", _calcular_resumo)
+
+
+def _calcular_servicos(df):
+    disciplina = df["disciplina"]
+    if isinstance(disciplina.dtype, pd.CategoricalDtype):
+        # Compara só as categorias em vez de todas as linhas
+        e_total = disciplina.cat.categories.str.strip().str.lower().isin(DISCIPLINAS_TOTAL)
+        codigos = disciplina.cat.codes.to_numpy()
+        filtro = ~(e_total[codigos] & (codigos >= 0))
+    else:
+        filtro = ~disciplina.str.strip().str.lower().isin(DISCIPLINAS_TOTAL)
+    filtrado = df[filtro]
+    cubo = _cubo(filtrado, ["om", "disciplina"])
+    por_disciplina = _reduzir(cubo, "disciplina")
+    # Mantém a ordem de aparição das disciplinas na planilha
+    ordem = pd.unique(filtrado["disciplina"].dropna())
+    por_disciplina = por_disciplina.set_index("disciplina").loc[list(ordem)].reset_index()
+    return {
+        "cubo": cubo,
+        "geral": _geral(cubo),
+        "por_disciplina": por_disciplina,
+    }
+
+
+def agregar_servicos(df_servicos):
+    """
+    Agregados da planilha de serviços, sem as linhas de disciplina "total" e
+    "total com bdi":
+      - "cubo": por (om, disciplina)
+      - "geral": total/media/minimo/maximo
+      - "por_disciplina": como em agregar_resumo, na ordem de aparição
+    """
+    return em_cache(df_servicos, "servicos", _calcular_servicos)
+
+
+def recortar_om(agregados, om):
+    """
+    Agregados de uma única OM (resumo ou serviços), reduzidos do cubo já
+    calculado para a planilha inteira, sem novo groupby sobre as linhas.
+    """
+    cubo = agregados["cubo"]
+    cubo_om = cubo[cubo["om"] == om].reset_index(drop=True)
+    recorte = {"cubo": cubo_om, "geral": _geral(cubo_om)}
+    if "por_solucao" in agregados:
+        recorte["por_om"] = _reduzir(cubo_om, "om")
+        recorte["por_solucao"] = _reduzir(cubo_om, "solucao_proposta")
+    else:
+        por_disciplina = _reduzir(cubo_om, "disciplina").set_index("disciplina")
+        # Mesma ordem de aparição da planilha inteira
+        ordem = [d for d in agregados["por_disciplina"]["disciplina"] if d in por_disciplina.index]
+        recorte["por_disciplina"] = por_disciplina.loc[ordem].reset_index()
+    return recorte
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Compara o tempo de carga a frio das planilhas TAB_VT_CAMFRIGO_* lidas do
+Excel (openpyxl) com a leitura do snapshot Feather via memory-map.
+
+Uso:
+
+    python benchmarks/benchmark_carregamento.py [pasta] [--repeticoes N]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshots  # noqa: E402
+from carregamento import ler_planilha_excel, ligar_copy_on_write  # noqa: E402
+
+
+def _cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pasta", nargs="?", default=".")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+    ligar_copy_on_write()
+
+    if not snapshots.disponivel():
+        print("pyarrow não está instalado; benchmark de snapshot indisponível.", file=sys.stderr)
+        return 1
+
+    planilhas = sorted(glob.glob(os.path.join(args.pasta, snapshots.PADRAO_PLANILHAS)))
+    print(f"{'planilha':<50} {'excel (ms)':>12} {'snapshot (ms)':>14} {'ganho':>8}")
+    for planilha in planilhas:
+        snapshots.gravar_snapshot(ler_planilha_excel(planilha), planilha)
+        t_excel = _cronometrar(lambda: ler_planilha_excel(planilha), args.repeticoes)
+        t_snap = _cronometrar(lambda: snapshots.ler_snapshot(planilha), args.repeticoes)
+        print(f"{os.path.basename(planilha):<50} {t_excel * 1000:>12.1f} {t_snap * 1000:>14.1f} "
+              f"{t_excel / t_snap:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
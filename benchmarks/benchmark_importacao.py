@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório de tempo de importação (python -X importtime) dos módulos que o
+dashboard importa na partida, para detectar regressões no cold start.
+
+Falha (código de saída 1) se algum módulo pesado que deveria ser importado
+sob demanda (plotly, wordcloud, openpyxl, matplotlib) entrar na partida ou se
+o tempo total passar do limite. O streamlit é medido à parte, só como
+referência, pois importa parte dessas bibliotecas por conta própria.
+
+Uso:
+
+    python benchmarks/benchmark_importacao.py [--limite-ms 1500] [--top 15]
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_APP = os.path.join(RAIZ, "ST_DASH_PJT_CAMFRIGO.py")
+
+MODULOS_SOB_DEMANDA = ["plotly", "wordcloud", "openpyxl", "matplotlib"]
+
+
+def modulos_app(script=SCRIPT_APP):
+    """
+    Módulos do próprio repositório importados no nível de topo de `script`,
+    na ordem em que aparecem. Importações dentro de funções ou blocos
+    (sob demanda) e bibliotecas de terceiros ficam de fora.
+    """
+    with open(script, encoding="utf-8") as f:
+        arvore = ast.parse(f.read(), filename=script)
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            nomes = [alias.name for alias in no.names]
+        elif isinstance(no, ast.ImportFrom) and no.level == 0 and no.module:
+            nomes = [no.module]
+        else:
+            continue
+        for nome in nomes:
+            topo = nome.split(".")[0]
+            if topo not in modulos and os.path.exists(os.path.join(RAIZ, f"{topo}.py")):
+                modulos.append(topo)
+    return modulos
+
+
+def medir_importacao(modulos):
+    """
+    Importa `modulos` em um interpretador novo com -X importtime.
+    Retorna (linhas, carregados): linhas como (cumulativo_us, profundidade, nome)
+    e o conjunto de pacotes de topo presentes em sys.modules ao final.
+    """
+    codigo = (f"import {', '.join(modulos)}, sys; "
+              "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))")
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ,
+                               capture_output=True, text=True, check=True)
+    linhas = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, nome = linha.split("|")
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        linhas.append((int(cumulativo), profundidade, nome.strip()))
+    return linhas, set(resultado.stdout.split())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limite-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    linhas, carregados = medir_importacao(modulos_app())
+    # Profundidade mínima = importações de topo; a soma delas é o custo total
+    topo = min(p for _, p, _ in linhas)
+    total_ms = sum(c for c, p, _ in linhas if p == topo) / 1000
+    print(f"Módulos do app: {total_ms:.0f} ms")
+    print(f"{'cumulativo (ms)':>16}  módulo")
+    for cumulativo, profundidade, nome in sorted(linhas, reverse=True)[:args.top]:
+        print(f"{cumulativo / 1000:>16.1f}  {'  ' * (profundidade - topo)}{nome}")
+
+    linhas_st, _ = medir_importacao(["streamlit"])
+    topo_st = min(p for _, p, _ in linhas_st)
+    print(f"\nReferência - streamlit: {sum(c for c, p, _ in linhas_st if p == topo_st) / 1000:.0f} ms")
+
+    falhas = []
+    indevidos = sorted(set(MODULOS_SOB_DEMANDA) & carregados)
+    if indevidos:
+        falhas.append(f"módulos pesados importados na partida: {', '.join(indevidos)}")
+    if total_ms > args.limite_ms:
+        falhas.append(f"tempo de importação {total_ms:.0f} ms acima do limite de {args.limite_ms:.0f} ms")
+    for falha in falhas:
+        print(f"REGRESSÃO: {falha}", file=sys.stderr)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
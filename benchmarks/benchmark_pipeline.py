@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do pipeline de dados do dashboard, fora do Streamlit, sobre
+campanhas sintéticas (benchmarks/dados_sinteticos.py) de 16, 1 mil, 10 mil e
+100 mil OMs.
+
+Etapas medidas, cada uma com tempo (mediana das repetições), vazão em
+linhas/s e pico de memória do tracemalloc (em uma passada separada, para
+não distorcer os tempos):
+
+  excel         read_excel + padronização (só até --excel-ate OMs)
+  snapshot      leitura do snapshot Feather (se houver pyarrow)
+  padronizacao  nomes de colunas, conversão de "valor" e categóricas
+  resumo        agregação da planilha de resumo
+  servicos      agregação da planilha de serviços
+  tokenizacao   índices de palavras das duas colunas de texto
+  frequencias   frequências das word clouds com todas as OMs (sem versão
+                não há cache, então inclui a tokenização)
+  figuras       gráficos plotly do Resumo e dos Serviços (com --figuras)
+  pipeline      pipeline.processar: as três seções em sequência, como um
+                rerun sem cache (com --figuras, também os gráficos)
+
+Uso:
+
+    python benchmarks/benchmark_pipeline.py [--oms 16 1000 10000 100000]
+        [--repeticoes 3] [--excel-ate 1000] [--figuras] [--sem-memoria] [--json saida.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import snapshots  # noqa: E402
+from agregacoes import agregar_resumo, agregar_servicos  # noqa: E402
+from carregamento import ler_planilha_excel, ligar_copy_on_write, padronizar_colunas  # noqa: E402
+from dados_sinteticos import gerar_campanha, gravar_campanha  # noqa: E402
+from frequencias import indexar_tokens  # noqa: E402
+from pipeline import (colunas_texto_problemas, frequencias_problemas, preparar_resumo,  # noqa: E402
+                      preparar_servicos, processar)
+
+
+def _medir(funcao, repeticoes, memoria):
+    """(mediana do tempo em s, pico de memória em bytes ou None)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcao()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return statistics.median(tempos), pico
+
+
+def _etapas(n_oms, crus, pasta, args):
+    """Lista de (nome, linhas processadas, função) para uma campanha."""
+    padronizados = {tipo: padronizar_colunas(df.copy()) for tipo, df in crus.items()}
+    resumo, servicos, problemas = padronizados["resumo"], padronizados["servicos"], padronizados["problemas"]
+    colunas = [col for col in colunas_texto_problemas(problemas) if col]
+    linhas = sum(len(df) for df in crus.values())
+    etapas = []
+
+    if n_oms <= args.excel_ate:
+        caminhos = gravar_campanha(pasta, n_oms)
+        etapas.append(("excel", linhas, lambda: [ler_planilha_excel(c) for c in caminhos.values()]))
+        if snapshots.disponivel():
+            for tipo, caminho in caminhos.items():
+                snapshots.gravar_snapshot(padronizados[tipo], caminho)
+            etapas.append(("snapshot", linhas, lambda: [snapshots.ler_snapshot(c) for c in caminhos.values()]))
+    elif snapshots.disponivel():
+        # Sem Excel (lento demais para gravar), o snapshot é gravado direto dos dados padronizados
+        caminhos = {tipo: os.path.join(pasta, f"TAB_VT_CAMFRIGO_SINT{n_oms}_{tipo}.xlsx") for tipo in crus}
+        for tipo, caminho in caminhos.items():
+            snapshots.gravar_snapshot(padronizados[tipo], caminho)
+        etapas.append(("snapshot", linhas, lambda: [snapshots.ler_snapshot(c) for c in caminhos.values()]))
+
+    etapas += [
+        ("padronizacao", linhas, lambda: [padronizar_colunas(df.copy()) for df in crus.values()]),
+        ("resumo", len(resumo), lambda: agregar_resumo(resumo)),
+        ("servicos", len(servicos), lambda: agregar_servicos(servicos)),
+        ("tokenizacao", len(problemas) * len(colunas),
+         lambda: [indexar_tokens(problemas, col) for col in colunas]),
+        ("frequencias", len(problemas) * len(colunas),
+         lambda: [frequencias_problemas(problemas, col) for col in colunas]),
+    ]
+    if args.figuras:
+        etapas.append(("figuras", len(resumo) + len(servicos),
+                       lambda: (preparar_resumo(resumo), preparar_servicos(servicos))))
+    etapas.append(("pipeline", len(resumo) + len(servicos) + len(problemas) * len(colunas),
+                   lambda: processar(resumo, servicos, problemas, figuras=args.figuras)))
+    return etapas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--oms", type=int, nargs="+", default=[16, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--excel-ate", type=int, default=1_000,
+                        help="maior campanha (em OMs) gravada e lida em .xlsx")
+    parser.add_argument("--figuras", action="store_true", help="inclui a construção dos gráficos plotly")
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+    ligar_copy_on_write()
+
+    resultados = []
+    print(f"{'OMs':>8} {'etapa':<14} {'linhas':>9} {'tempo (ms)':>11} {'linhas/s':>12} {'pico (MB)':>10}")
+    for n_oms in args.oms:
+        crus = gerar_campanha(n_oms)
+        with tempfile.TemporaryDirectory() as pasta:
+            for nome, linhas, funcao in _etapas(n_oms, crus, pasta, args):
+                tempo, pico = _medir(funcao, args.repeticoes, not args.sem_memoria)
+                vazao = linhas / tempo if tempo > 0 else float("inf")
+                pico_txt = f"{pico / 2**20:>10.1f}" if pico is not None else f"{'-':>10}"
+                print(f"{n_oms:>8} {nome:<14} {linhas:>9} {tempo * 1000:>11.1f} {vazao:>12,.0f} {pico_txt}")
+                resultados.append({"oms": n_oms, "etapa": nome, "linhas": linhas, "tempo": tempo,
+                                   "linhas_por_segundo": vazao, "pico_memoria": pico})
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
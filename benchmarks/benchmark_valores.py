@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark da conversão da coluna "valor": converter_valor_para_numero
+aplicada linha a linha (Series.apply) contra converter_valores_para_numero
+vetorizada. Antes de medir, confere que as duas produzem o mesmo resultado
+nos dados sintéticos; os casos de borda estão em tests/test_valores.py.
+
+Uso:
+
+    python benchmarks/benchmark_valores.py [--tamanhos 10000 100000 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carregamento import converter_valor_para_numero, converter_valores_para_numero  # noqa: E402
+
+
+def _formatar_brl(valor):
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def gerar_valores(n, semente=0):
+    """Mistura de textos "R$ 1.234,56", números puros, vazios e lixo."""
+    rng = np.random.default_rng(semente)
+    numeros = rng.gamma(2.0, 50_000.0, size=n).round(2)
+    serie = pd.Series([_formatar_brl(v) for v in numeros], dtype=object)
+    sorteio = rng.random(n)
+    serie[sorteio < 0.10] = numeros[sorteio < 0.10]
+    serie[(sorteio >= 0.10) & (sorteio < 0.11)] = None
+    serie[(sorteio >= 0.11) & (sorteio < 0.115)] = "a definir"
+    return serie
+
+
+def _conferir(serie):
+    esperado = serie.apply(converter_valor_para_numero).astype("float64")
+    obtido, _ = converter_valores_para_numero(serie)
+    pd.testing.assert_series_equal(obtido, esperado, check_names=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'linhas':>10} {'apply (ms)':>12} {'vetorizado (ms)':>16} {'ganho':>8} {'falhas':>8}")
+    for n in args.tamanhos:
+        serie = gerar_valores(n)
+        _conferir(serie)
+        inicio = time.perf_counter()
+        serie.apply(converter_valor_para_numero)
+        t_apply = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        _, falhas = converter_valores_para_numero(serie)
+        t_vet = time.perf_counter() - inicio
+        print(f"{n:>10} {t_apply * 1000:>12.1f} {t_vet * 1000:>16.1f} {t_apply / t_vet:>7.1f}x {int(falhas.sum()):>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de carga de memória: quanto cada sessão adicional do dashboard custa
+ao processo.
+
+Simula N sessões simultâneas sobre uma campanha sintética gravada em .xlsx
+(benchmarks/dados_sinteticos.py). Cada sessão refaz o trabalho de um rerun
+do ST_DASH_PJT_CAMFRIGO.py (leitura das três planilhas, agregações, figuras,
+índices de palavras, frequências com um filtro de OMs próprio, word cloud e
+uma página de cada tabela) e mantém o resultado vivo, como uma sessão no meio
+do rerun. Após cada sessão é medida a memória alocada (tracemalloc) e o RSS
+do processo (/proc, só no Linux).
+
+Com --sem-compartilhamento cada sessão trabalha sobre uma cópia própria das
+planilhas, sem a versão que liga os caches derivados, reproduzindo o custo
+de cada sessão montar os próprios DataFrames e agregados.
+
+Uso:
+
+    python benchmarks/carga_sessoes.py [--oms 1000] [--sessoes 10] [--sem-compartilhamento]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from carregamento import ligar_copy_on_write  # noqa: E402
+from dados_sinteticos import gravar_campanha  # noqa: E402
+from frequencias import STOPWORDS, frequencias_selecionadas, indexar_tokens  # noqa: E402
+from nuvem_palavras import renderizar_nuvem  # noqa: E402
+from pipeline import colunas_texto_problemas, preparar_resumo, preparar_servicos  # noqa: E402
+from registro import carregar_campanhas, descobrir_campanhas  # noqa: E402
+from tabelas import pagina  # noqa: E402
+
+
+def _rss():
+    """RSS do processo em bytes, ou None fora do Linux."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def sessao(campanhas, selecionadas, semente, compartilhar=True):
+    """Um rerun completo de uma sessão; devolve tudo o que ela referencia."""
+    planilhas = {tipo: carregar_campanhas(campanhas, selecionadas, tipo)[0]
+                 for tipo in ("resumo", "servicos", "problemas")}
+    if not compartilhar:
+        planilhas = {tipo: df.copy() for tipo, df in planilhas.items()}
+        for df in planilhas.values():
+            df.attrs.pop("versao", None)
+    resumo, servicos, problemas = planilhas["resumo"], planilhas["servicos"], planilhas["problemas"]
+
+    oms = sorted(problemas["om"].dropna().unique(), key=str)
+    filtro = random.Random(semente).sample(oms, max(1, len(oms) // 4))
+    linhas = problemas["om"].isin(filtro).to_numpy().nonzero()[0]
+    estado = {
+        "planilhas": planilhas,
+        "resumo": preparar_resumo(resumo),
+        "servicos": preparar_servicos(servicos),
+        "paginas": [pagina(resumo, 1), pagina(problemas, 1, linhas=linhas)],
+        "nuvens": [],
+    }
+    for col in colunas_texto_problemas(problemas):
+        if col:
+            freq = frequencias_selecionadas(indexar_tokens(problemas, col), filtro, STOPWORDS)
+            estado["nuvens"].append(renderizar_nuvem(freq) if freq else None)
+    return estado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--oms", type=int, default=1_000)
+    parser.add_argument("--sessoes", type=int, default=10)
+    parser.add_argument("--sem-compartilhamento", action="store_true",
+                        help="cada sessão com cópia própria das planilhas e dos agregados")
+    args = parser.parse_args(argv)
+    ligar_copy_on_write()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        gravar_campanha(pasta, args.oms)
+        campanhas = descobrir_campanhas(pasta)
+        selecionadas = list(campanhas)
+
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        sessoes = []
+        incrementos = []
+        anterior = base
+        print(f"{'sessão':>6} {'alocado (MB)':>13} {'incremento (MB)':>16} {'RSS (MB)':>9}")
+        for i in range(args.sessoes):
+            sessoes.append(sessao(campanhas, selecionadas, i, not args.sem_compartilhamento))
+            atual = tracemalloc.get_traced_memory()[0]
+            incrementos.append(atual - anterior)
+            anterior = atual
+            rss = _rss()
+            rss_txt = f"{rss / 2**20:>9.1f}" if rss is not None else f"{'-':>9}"
+            print(f"{i + 1:>6} {(atual - base) / 2**20:>13.1f} {incrementos[-1] / 2**20:>16.2f} {rss_txt}")
+        tracemalloc.stop()
+
+    # A primeira sessão paga o armazém compartilhado; as demais, só o próprio estado
+    print(f"Primeira sessão: {incrementos[0] / 2**20:.2f} MB")
+    if len(incrementos) > 1:
+        media = sum(incrementos[1:]) / (len(incrementos) - 1)
+        print(f"Cada sessão adicional: {media / 2**20:.2f} MB em média")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Geradores de planilhas sintéticas de vistoria (RESUMO, SERVICOS e
+PRINCIPAIS_PROBLEMAS) com o mesmo layout das planilhas reais: cabeçalhos
+originais (maiúsculas, acentos), valores como texto "R$ 1.234,56" misturados
+a números, vazios e alguns textos inválidos, disciplinas com as linhas
+"TOTAL"/"TOTAL COM BDI" e textos de defeitos e soluções em português.
+
+Os DataFrames saem "crus", como viriam do read_excel, para passar por
+carregamento.padronizar_colunas. Também pode ser usado pela linha de comando
+para gravar as três planilhas de uma campanha sintética:
+
+    python benchmarks/dados_sinteticos.py PASTA --oms 1000 [--campanha SINT1000]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ESTADOS = ["Bom", "Ruim", "Precário"]
+SOLUCOES = ["Reforma câmara modular", "Câmara container", "Nova câmara modular",
+            "Manutenção corretiva", "Substituição do equipamento"]
+DISCIPLINAS = ["MECÂNICA", "CIVIL", "ELÉTRICA", "REFRIGERAÇÃO", "HIDRÁULICA", "SEGURANÇA"]
+TIPOS_OM = ["BLog", "GAAAe", "BI Mtz", "RCB", "Cia Com", "B Adm", "H Gu", "CMB", "BEC"]
+
+DEFEITOS = [
+    "Capacidade da Câmara: a câmara não atende à demanda mensal necessária",
+    "Disposição do material: o material está encostado nas paredes e sem distância do solo",
+    "Isolamento térmico: painéis com infiltração e perda de vedação nas portas",
+    "Compressor: ruído excessivo e desarme frequente por sobrecarga",
+    "Evaporador: acúmulo de gelo e degelo ineficiente",
+    "Quadro elétrico: cabos sem identificação e disjuntores subdimensionados",
+    "Piso: revestimento danificado e ralos sem sifão",
+    "Termômetro: ausência de registro diário de temperatura",
+]
+COMPLEMENTOS = [
+    "segundo dados fornecidos pela OM", "o que compromete o armazenamento dos gêneros",
+    "conforme observado durante a vistoria", "com risco de perda dos gêneros congelados",
+    "há mais de um ano", "em ambas as câmaras", "sem contrato de manutenção vigente", "",
+]
+SOLUCOES_TEXTO = [
+    "Substituir o compressor e revisar a carga de gás refrigerante.",
+    "Treinamento e orientação com a equipe responsável.",
+    "Instalar estrados plásticos e manter distância das paredes.",
+    "Ao inserir o container para congelados, transformar a câmara de congelados em resfriados.",
+    "Refazer o quadro elétrico conforme a NBR 5410.",
+    "Trocar as borrachas de vedação das portas.",
+]
+
+
+def _formatar_brl(valor):
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def nomes_oms(n_oms):
+    """Siglas únicas no estilo das OMs reais ("11º GAAAe", "16º BLog"...)."""
+    return [f"{i // len(TIPOS_OM) + 1}º {TIPOS_OM[i % len(TIPOS_OM)]}" for i in range(n_oms)]
+
+
+def valores_brl(n, rng):
+    """Valores monetários: ~80% texto "R$", ~15% número, ~4% vazio, ~1% inválido."""
+    numeros = rng.gamma(2.0, 50_000.0, size=n).round(2)
+    valores = np.array([_formatar_brl(v) for v in numeros], dtype=object)
+    sorteio = rng.random(n)
+    numericos = sorteio >= 0.80
+    valores[numericos] = numeros[numericos]
+    valores[(sorteio >= 0.95) & (sorteio < 0.99)] = None
+    valores[sorteio >= 0.99] = "a definir"
+    return valores
+
+
+def gerar_resumo(n_oms, semente=0):
+    """Uma linha por OM, como a planilha RESUMO."""
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        "OM": nomes_oms(n_oms),
+        "ESTADO GERAL": rng.choice(ESTADOS, size=n_oms),
+        "SOLUÇÃO PROPOSTA": rng.choice(SOLUCOES, size=n_oms),
+        "VALOR ESTIMADO": valores_brl(n_oms, rng),
+        "NR OPUS": 202511000000 + np.arange(n_oms),
+    })
+
+
+def gerar_servicos(n_oms, semente=0):
+    """Três a seis disciplinas por OM, seguidas das linhas TOTAL e TOTAL COM BDI."""
+    rng = np.random.default_rng(semente + 1)
+    oms = nomes_oms(n_oms)
+    n_disc = rng.integers(3, len(DISCIPLINAS) + 1, size=n_oms)
+    om_linha = np.repeat(np.arange(n_oms), n_disc + 2)
+    disciplinas = []
+    for n in n_disc:
+        disciplinas.extend(DISCIPLINAS[:n])
+        disciplinas.extend(["TOTAL", "TOTAL COM BDI"])
+    n_linhas = len(om_linha)
+    return pd.DataFrame({
+        "ITEM": np.arange(1, n_linhas + 1, dtype=float),
+        "DISCIPLINA": disciplinas,
+        "VALOR ESTIMADO": valores_brl(n_linhas, rng),
+        "FVT (NR ORDEM)": (om_linha + 1).astype(float),
+        "NR OPUS": (202511000000 + om_linha).astype(float),
+        "OM": np.array(oms, dtype=object)[om_linha],
+        "NOME DA OM": np.array([f"Organização Militar {om}" for om in oms], dtype=object)[om_linha],
+        "NR RELATORIO": [f"Relatório de Vistoria Técnica - {i + 1}" for i in om_linha],
+    })
+
+
+def gerar_problemas(n_oms, semente=0):
+    """Um a cinco defeitos por OM, com texto livre e, às vezes, sem solução proposta."""
+    rng = np.random.default_rng(semente + 2)
+    oms = nomes_oms(n_oms)
+    n_prob = rng.integers(1, 6, size=n_oms)
+    om_linha = np.repeat(np.arange(n_oms), n_prob)
+    n_linhas = len(om_linha)
+    defeitos = rng.integers(len(DEFEITOS), size=n_linhas)
+    complementos = rng.integers(len(COMPLEMENTOS), size=n_linhas)
+    quantidades = rng.integers(1, 20, size=n_linhas)
+    textos_def = [f"{DEFEITOS[d]}, {COMPLEMENTOS[c]} ({q} freezers)."
+                  for d, c, q in zip(defeitos, complementos, quantidades)]
+    solucoes = np.array(SOLUCOES_TEXTO, dtype=object)[rng.integers(len(SOLUCOES_TEXTO), size=n_linhas)]
+    solucoes[rng.random(n_linhas) < 0.1] = None
+    return pd.DataFrame({
+        "OM NOME": np.array([f"Organização Militar {om}" for om in oms], dtype=object)[om_linha],
+        "NR LAUDO": om_linha + 1,
+        "PRINCIPAIS DEFEITOS": textos_def,
+        "SOLUÇÕES PROPOSTAS": solucoes,
+        "OM": np.array(oms, dtype=object)[om_linha],
+    })
+
+
+def gerar_campanha(n_oms, semente=0):
+    """{"resumo": df, "servicos": df, "problemas": df} crus, de uma campanha com n_oms OMs."""
+    return {
+        "resumo": gerar_resumo(n_oms, semente),
+        "servicos": gerar_servicos(n_oms, semente),
+        "problemas": gerar_problemas(n_oms, semente),
+    }
+
+
+SUFIXOS = {"resumo": "RESUMO", "servicos": "SERVICOS", "problemas": "PRINCIPAIS_PROBLEMAS"}
+
+
+def gravar_campanha(pasta, n_oms, campanha=None, semente=0):
+    """Grava as três planilhas .xlsx em `pasta` e devolve {tipo: caminho}."""
+    campanha = campanha or f"SINT{n_oms}"
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = {}
+    for tipo, df in gerar_campanha(n_oms, semente).items():
+        caminho = os.path.join(pasta, f"TAB_VT_CAMFRIGO_{campanha}_{SUFIXOS[tipo]}.xlsx")
+        df.to_excel(caminho, index=False, engine="openpyxl")
+        caminhos[tipo] = caminho
+    return caminhos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pasta")
+    parser.add_argument("--oms", type=int, default=16)
+    parser.add_argument("--campanha", default=None)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+    for caminho in gravar_campanha(args.pasta, args.oms, args.campanha, args.semente).values():
+        print(caminho)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+Camada de carregamento das planilhas de vistoria (TAB_VT_CAMFRIGO_*).
+
+As planilhas são lidas e padronizadas uma única vez por processo e mantidas
+em cache, indexadas pelo caminho absoluto do arquivo. A validade de cada
+entrada é conferida pela assinatura (mtime + tamanho) do arquivo; quando a
+assinatura muda, o conteúdo é comparado por hash antes de reler a planilha,
+de modo que um arquivo apenas "tocado" não provoca nova leitura.
+
+Em cache frio, a planilha é lida do snapshot colunar (ver snapshots.py)
+quando ele foi gerado do mesmo conteúdo (SHA-1); caso contrário o Excel é
+lido e o snapshot é regravado para as próximas partidas.
+
+As planilhas em cache formam o armazém compartilhado por todas as sessões
+do processo: cada planilha existe uma única vez em memória, e cada sessão
+recebe apenas uma visão (visao) dela. Com o Copy-on-Write do pandas ligado
+(ligar_copy_on_write, chamado pelos pontos de entrada: dashboard, exportação
+e benchmarks), a visão não copia nenhum dado e qualquer escrita nela (nova
+coluna, atribuição de valores) fica restrita à visão, sem alterar o armazém.
+"""
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # sem pyarrow, a limpeza dos textos usa os métodos .str do pandas
+    pa = pc = None
+
+import snapshots
+from execucao import etapa
+
+# caminho absoluto -> {"assinatura": (mtime_ns, tamanho), "hash": str, "df": DataFrame, "bytes": int},
+# em ordem de uso (LRU) e limitado a LIMITE_PLANILHAS entradas
+_cache = OrderedDict()
+LIMITE_PLANILHAS = int(os.environ.get("CAMFRIGO_LIMITE_PLANILHAS", 48))
+_trava = threading.Lock()
+# Uma trava por arquivo: planilhas diferentes podem ser lidas em paralelo,
+# e duas sessões pedindo a mesma planilha não a leem duas vezes
+_travas_arquivos = {}
+
+# Contadores globais do processo (todas as sessões)
+estatisticas = {"acertos": 0, "falhas": 0}
+
+# Colunas de texto sempre mantidas como categóricas (chaves das agregações)
+COLUNAS_CATEGORICAS = ("om", "disciplina", "solucao_proposta", "estado_geral")
+# Demais colunas de texto viram categóricas quando os valores distintos não
+# passam desta fração das linhas
+FRACAO_CATEGORICA = 0.5
+# Colunas somadas nas agregações: mantidas em float64 mesmo quando o float32
+# representaria cada valor, para não acumular erro de arredondamento nos totais
+COLUNAS_FLOAT64 = ("valor",)
+
+
+# Função para remover acentos de uma string
+def remover_acentos(txt):
+    return ''.join(c for c in unicodedata.normalize('NFD', txt) if unicodedata.category(c) != 'Mn')
+
+
+# Função para converter valores para float
+def converter_valor_para_numero(valor_str):
+    if isinstance(valor_str, (int, float)):
+        return float(valor_str)
+    if isinstance(valor_str, str):
+        try:
+            valor_limpo = valor_str.replace("R$", "").strip().replace(".", "").replace(",", ".")
+            return float(valor_limpo)
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+# Tipos aceitos diretamente como número por converter_valor_para_numero
+_TIPOS_NUMERICOS = [int, float, bool, np.float64]
+
+# Textos que o cast do Arrow converte exatamente como o float() do Python
+_REGEX_DECIMAL = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+# Textos convertidos por vez no caminho do Arrow
+BLOCO_TEXTOS = 65536
+# Classe de cada byte de um texto já limpo: dígito (1), outro caractere que um
+# decimal pode conter (0) ou qualquer outro (1 << 16), inclusive os bytes de
+# caracteres não ASCII e os separadores \x1c-\x1f, que o strip() remove e o
+# float() não
+_CLASSE_BYTE = np.full(256, 1 << 16, dtype=np.int32)
+_CLASSE_BYTE[np.frombuffer(b"0123456789", dtype=np.uint8)] = 1
+_CLASSE_BYTE[np.frombuffer(b".+-eE \t\n\r\x0b\x0c", dtype=np.uint8)] = 0
+
+
+def _limpar_texto(texto):
+    return texto.replace("R$", "").strip().replace(".", "").replace(",", ".")
+
+
+def _somar_por_texto(valores, offsets):
+    """Soma de `valores` em cada faixa [offsets[i], offsets[i+1]); `valores` tem um elemento extra no fim."""
+    somas = np.add.reduceat(valores, offsets[:-1], dtype=np.int32)
+    somas[offsets[1:] == offsets[:-1]] = 0  # reduceat devolve o elemento seguinte para faixas vazias
+    return somas
+
+
+def _limpar_bytes(arr):
+    """
+    Remove "R$" e "." e troca "," por "." em um StringArray do Arrow, em uma
+    única passada sobre os bytes UTF-8 (nenhum deles aparece dentro de um
+    caractere multibyte).
+
+    Textos que não podem ser um decimal (algum caractere fora de dígitos,
+    sinal, ponto, expoente e espaços ASCII, ou nenhum dígito) saem nulos. Nos
+    demais, o strip feito antes da remoção dos pontos só muda espaços nas
+    pontas, que o trim e o float() ignoram, então pode ficar para depois.
+    """
+    _, buf_offsets, buf_dados = arr.buffers()
+    offsets = np.frombuffer(buf_offsets, dtype=np.int32)[arr.offset:arr.offset + len(arr) + 1]
+    if buf_dados is None or offsets[-1] == offsets[0]:
+        return pa.nulls(len(arr), pa.string())
+    dados = np.frombuffer(buf_dados, dtype=np.uint8)[offsets[0]:offsets[-1]]
+    offsets = offsets - offsets[0]
+    # "R$" só conta dentro de um mesmo texto, não entre o fim de um e o início do seguinte
+    cifrao = (dados[:-1] == ord("R")) & (dados[1:] == ord("$"))
+    inicios = offsets[1:-1]
+    cifrao[inicios[(inicios > 0) & (inicios < len(dados))] - 1] = False
+    # Um elemento a mais no fim: reduceat aceita então os offsets dos textos vazios finais
+    remover = np.zeros(len(dados) + 1, dtype=bool)
+    np.equal(dados, ord("."), out=remover[:-1])
+    remover[:-2] |= cifrao
+    remover[1:-1] |= cifrao
+    limpos = dados[~remover[:-1]]
+    np.add(limpos, (limpos == ord(",")).view(np.uint8) << 1, out=limpos)  # "," (44) + 2 = "." (46)
+    novos_offsets = np.zeros(len(offsets), dtype=np.int32)
+    np.cumsum(np.diff(offsets) - _somar_por_texto(remover.view(np.uint8), offsets), out=novos_offsets[1:])
+
+    classes = np.zeros(len(limpos) + 1, dtype=np.int32)
+    np.take(_CLASSE_BYTE, limpos, out=classes[:-1])
+    somas = _somar_por_texto(classes, novos_offsets)
+    decimais = (somas > 0) & (somas < 1 << 16)
+    return pa.Array.from_buffers(pa.string(), len(arr), [pa.py_buffer(np.packbits(decimais, bitorder="little")),
+                                                         pa.py_buffer(novos_offsets), pa.py_buffer(limpos)])
+
+
+def _limpar_e_converter_textos(textos):
+    """
+    Aplica a limpeza de "R$ 1.234,56" a um array de str e converte para
+    float64. Os textos que este caminho não converte ficam NaN.
+    """
+    if pc is None:
+        # Sem pyarrow, uma única passada em Python é mais rápida que quatro chamadas .str
+        return pd.to_numeric(np.array([_limpar_texto(t) for t in textos], dtype=object),
+                             errors="coerce").astype("float64")
+    convertidos = np.empty(len(textos), dtype="float64")
+    # Em blocos, os arrays intermediários cabem no cache do processador
+    for inicio in range(0, len(textos), BLOCO_TEXTOS):
+        arr = pc.utf8_trim_whitespace(_limpar_bytes(pa.array(textos[inicio:inicio + BLOCO_TEXTOS],
+                                                             type=pa.string())))
+        try:
+            numeros = pc.cast(arr, pa.float64())
+        except pa.ArrowInvalid:
+            # Sobram textos como "1-2" ou "e5": converte só os que têm forma decimal
+            validos = pc.match_substring_regex(arr, _REGEX_DECIMAL)
+            numeros = pc.cast(pc.if_else(validos, arr, None), pa.float64())
+        convertidos[inicio:inicio + len(arr)] = numeros.to_numpy(zero_copy_only=False)
+    return convertidos
+
+
+def converter_valores_para_numero(serie):
+    """
+    Versão vetorizada de converter_valor_para_numero para uma Series inteira.
+
+    Retorna (valores, falhas): `valores` em float64 com o mesmo resultado da
+    função por linha e `falhas`, máscara booleana das linhas cujo conteúdo não
+    pôde ser interpretado (texto inválido ou tipo não numérico). Essas linhas
+    continuam valendo 0.0, mas podem ser reportadas ao usuário.
+    """
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.astype("float64"), pd.Series(False, index=serie.index)
+
+    brutos = serie.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(brutos, skipna=True) == "string":
+        # Caso comum: só textos e células vazias; dispensa inspecionar o tipo de cada linha
+        e_texto = ~pd.isna(brutos)
+    else:
+        e_texto = np.fromiter(map(type, brutos), dtype=object, count=len(brutos)) == str
+
+    # Tipo e ausência só decidem as células que não são texto (números, datas,
+    # vazias), em geral uma fração pequena da coluna
+    outros = np.flatnonzero(~e_texto)
+    brutos_outros = brutos[outros]
+    tipos_outros = np.fromiter(map(type, brutos_outros), dtype=object, count=len(outros))
+    e_numero = np.zeros(len(brutos), dtype=bool)
+    e_numero[outros] = pd.Series(tipos_outros, dtype=object).isin(_TIPOS_NUMERICOS).to_numpy()
+    falhas = np.zeros(len(brutos), dtype=bool)
+    falhas[outros] = ~(e_numero[outros] | pd.isna(brutos_outros))
+
+    valores = np.zeros(len(brutos), dtype="float64")
+    valores[e_numero] = brutos[e_numero].astype("float64")
+
+    textos = brutos[e_texto]
+    convertidos = _limpar_e_converter_textos(textos)
+    # As poucas linhas recusadas pelo caminho vetorizado passam pela limpeza e
+    # pelo float() do Python, que aceita "nan", "1_000", "infinity" etc., como
+    # a função original.
+    falhas_texto = np.zeros(len(convertidos), dtype=bool)
+    for pos in np.flatnonzero(np.isnan(convertidos)):
+        try:
+            convertidos[pos] = float(_limpar_texto(textos[pos]))
+        except ValueError:
+            convertidos[pos] = 0.0
+            falhas_texto[pos] = True
+    valores[e_texto] = convertidos
+    falhas[e_texto] = falhas_texto
+
+    return pd.Series(valores, index=serie.index), pd.Series(falhas, index=serie.index)
+
+
+def padronizar_colunas(df):
+    """
+    Padroniza os nomes das colunas (minúsculas, sem acentos, espaços por "_"),
+    renomeia "valor_estimado" para "valor", converte a coluna de valor para
+    float64 (registrando em df.attrs["valor_falhas"] as linhas não
+    reconhecidas) e compacta os tipos das colunas (ver compactar_tipos).
+    """
+    if df.empty:
+        return df
+    df.columns = [remover_acentos(str(col).strip().lower().replace(" ", "_")) for col in df.columns]
+    if "valor" not in df.columns and "valor_estimado" in df.columns:
+        df = df.rename(columns={"valor_estimado": "valor"})
+    if "valor" in df.columns:
+        df["valor"], falhas = converter_valores_para_numero(df["valor"])
+        # Índices das linhas com valor não reconhecido (preservados no snapshot)
+        df.attrs["valor_falhas"] = [int(i) for i in df.index[falhas]]
+    return compactar_tipos(df)
+
+
+def compactar_tipos(df):
+    """
+    Reduz a memória do DataFrame sem alterar os valores: colunas de texto de
+    baixa cardinalidade (e as de COLUNAS_CATEGORICAS) viram categóricas,
+    inteiros passam ao menor tipo que os comporta e floats passam a float32
+    quando a conversão é exata. As colunas são substituídas no próprio df.
+    """
+    with etapa("Compactação dos tipos"):
+        # Por posição: nomes repetidos de coluna não quebram a compactação
+        for pos, col in enumerate(df.columns):
+            serie = df.iloc[:, pos]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                continue
+            if col in COLUNAS_CATEGORICAS:
+                df.isetitem(pos, serie.astype("category"))
+            elif serie.dtype == object:
+                if pd.api.types.infer_dtype(serie, skipna=True) != "string":
+                    continue  # tipos misturados: o Arrow não grava categorias mistas
+                if serie.nunique() <= len(serie) * FRACAO_CATEGORICA:
+                    df.isetitem(pos, serie.astype("category"))
+            elif pd.api.types.is_integer_dtype(serie.dtype):
+                df.isetitem(pos, pd.to_numeric(serie, downcast="integer"))
+            elif pd.api.types.is_float_dtype(serie.dtype) and col not in COLUNAS_FLOAT64:
+                valores = serie.to_numpy()
+                reduzidos = valores.astype("float32")
+                if np.array_equal(reduzidos.astype(valores.dtype), valores, equal_nan=True):
+                    df.isetitem(pos, reduzidos)
+    return df
+
+
+def relatorio_memoria(df):
+    """
+    Memória ocupada pelo DataFrame: {"total": bytes, "colunas": {coluna:
+    (dtype, bytes)}}, com as colunas da maior para a menor.
+    """
+    uso = df.memory_usage(deep=True, index=True)
+    colunas = {col: (str(df[col].dtype), int(uso[col])) for col in df.columns}
+    return {
+        "total": int(uso.sum()),
+        "colunas": dict(sorted(colunas.items(), key=lambda item: -item[1][1])),
+    }
+
+
+def ler_planilha_excel(caminho):
+    """Lê e padroniza a planilha diretamente do Excel (sem cache)."""
+    with etapa("read_excel"):
+        df = pd.read_excel(caminho, engine='openpyxl')
+    with etapa("Padronização das colunas"):
+        return padronizar_colunas(df)
+
+
+def _ler_planilha(caminho, conteudo):
+    """
+    Lê do snapshot colunar quando ele foi gerado a partir deste conteúdo
+    (SHA-1 `conteudo`); senão do Excel, regravando o snapshot.
+    """
+    if snapshots.snapshot_atualizado(caminho, conteudo):
+        try:
+            with etapa("Leitura do snapshot"):
+                df = snapshots.ler_snapshot(caminho)
+            # Snapshots gravados antes da compactação de tipos ainda trazem object/int64
+            return compactar_tipos(df)
+        except Exception:
+            pass  # snapshot corrompido ou incompatível: volta ao Excel
+    df = ler_planilha_excel(caminho)
+    if snapshots.disponivel():
+        try:
+            with etapa("Gravação do snapshot"):
+                snapshots.gravar_snapshot(df, caminho, conteudo)
+        except Exception:
+            pass  # pasta somente leitura ou colunas não suportadas pelo Arrow
+    return df
+
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def carregar_planilha(caminho):
+    """
+    Retorna (df, acerto) para a planilha indicada.
+
+    `acerto` é True quando o DataFrame veio do cache sem reler o Excel.
+    Exceções de leitura (arquivo ausente, formato inválido) são propagadas.
+    """
+    chave = os.path.abspath(caminho)
+    assinatura = _assinatura(chave)
+    with _trava:
+        trava_arquivo = _travas_arquivos.setdefault(chave, threading.Lock())
+    with trava_arquivo:
+        with _trava:
+            entrada = _cache.get(chave)
+        if entrada is not None and entrada["assinatura"] == assinatura:
+            _registrar_acerto(chave)
+            return entrada["df"], True
+
+        # Assinatura mudou: confere o conteúdo antes de reler a planilha
+        with etapa("Hash do arquivo"):
+            conteudo = snapshots.hash_arquivo(chave)
+        if entrada is not None and entrada["hash"] == conteudo:
+            entrada["assinatura"] = assinatura
+            _registrar_acerto(chave)
+            return entrada["df"], True
+
+        df = _ler_planilha(chave, conteudo)
+        # Versão do conteúdo, usada como chave pelos caches derivados (agregações etc.)
+        df.attrs["versao"] = conteudo
+        with _trava:
+            _cache[chave] = {"assinatura": assinatura, "hash": conteudo, "df": df,
+                             "bytes": int(df.memory_usage(deep=True).sum())}
+            _cache.move_to_end(chave)
+            # Descarta as planilhas usadas há mais tempo para limitar a memória
+            while len(_cache) > LIMITE_PLANILHAS:
+                _cache.popitem(last=False)
+            estatisticas["falhas"] += 1
+        return df, False
+
+
+def _registrar_acerto(chave):
+    with _trava:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+        estatisticas["acertos"] += 1
+
+
+def versao_em_cache(caminho):
+    """Versão (hash do conteúdo) da planilha em cache, ou None se não estiver em cache."""
+    with _trava:
+        entrada = _cache.get(os.path.abspath(caminho))
+    return entrada["hash"] if entrada is not None else None
+
+
+def descartar(caminho):
+    """Remove a planilha do cache (arquivo apagado) e devolve a versão descartada."""
+    with _trava:
+        entrada = _cache.pop(os.path.abspath(caminho), None)
+    return entrada["hash"] if entrada is not None else None
+
+
+def ligar_copy_on_write():
+    """
+    Liga o Copy-on-Write do pandas (padrão a partir do pandas 3.0): visões,
+    renomeações e seleções de colunas compartilham os dados das planilhas em
+    cache até serem escritas. Chamado uma vez pelos pontos de entrada, não
+    na importação deste módulo.
+    """
+    pd.set_option("mode.copy_on_write", True)
+
+
+def visao(df):
+    """
+    Visão da planilha compartilhada para uma sessão: mesmos dados e attrs,
+    sem cópia. Só é segura com o Copy-on-Write ligado (ligar_copy_on_write):
+    aí escritas na visão não alteram a planilha em cache. Sem ele, uma
+    atribuição de valores na visão escreveria no armazém de todas as sessões.
+    """
+    return df.copy(deep=False)
+
+
+def memoria_cache():
+    """(planilhas, bytes) mantidos pelo cache de planilhas do processo."""
+    with _trava:
+        return len(_cache), sum(entrada["bytes"] for entrada in _cache.values())
+
+
+def limpar_cache():
+    """Descarta todas as planilhas em cache e zera os contadores."""
+    with _trava:
+        _cache.clear()
+        estatisticas["acertos"] = 0
+        estatisticas["falhas"] = 0
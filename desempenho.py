@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico de desempenho dos reruns do dashboard.
+
+Cada rerun gera um registro com o tempo total, os tempos por seção, por
+tarefa e por etapa interna (ver execucao.etapa) e, quando medido, o pico de
+memória do tracemalloc. Os registros ficam em memória (últimos
+LIMITE_HISTORICO, compartilhados por todas as sessões do processo) para o
+cálculo de p50/p95 e, se CAMFRIGO_LOG_DESEMPENHO apontar para um arquivo, são
+acrescentados a ele em JSON lines. Na primeira gravação o histórico é
+completado com o final do arquivo existente, de modo que os percentis
+sobrevivem a reinícios.
+
+Resumo de um log pela linha de comando:
+    python desempenho.py [arquivo.jsonl]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+ARQUIVO_LOG = os.environ.get("CAMFRIGO_LOG_DESEMPENHO", "")
+LIMITE_HISTORICO = 500
+
+_historico = deque(maxlen=LIMITE_HISTORICO)
+_trava = threading.Lock()
+_log_lido = False
+
+
+def registro_execucao(execucao):
+    """Monta o registro (serializável em JSON) de um rerun já encerrado."""
+    registro = {
+        "instante": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "paralelo": execucao.paralelo,
+        "total": execucao.tempo_total(),
+        "serial": execucao.tempo_serial(),
+        "secoes": dict(execucao.tempos_secoes),
+        "tarefas": dict(execucao.tempos_tarefas),
+        "etapas": {tarefa: [[nome, tempo] for nome, tempo in etapas]
+                   for tarefa, etapas in execucao.etapas_tarefas.items() if etapas},
+    }
+    if execucao.memoria:
+        registro["pico_memoria"] = execucao.pico_memoria
+        registro["memoria_secoes"] = dict(execucao.memoria_secoes)
+        registro["memoria_tarefas"] = dict(execucao.memoria_tarefas)
+    return registro
+
+
+def ler_log(caminho, limite=LIMITE_HISTORICO):
+    """Últimos `limite` registros válidos do arquivo (linhas inválidas são ignoradas)."""
+    registros = deque(maxlen=limite)
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registros.append(json.loads(linha))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return list(registros)
+
+
+def registrar(registro, arquivo=ARQUIVO_LOG):
+    """Acrescenta o registro ao histórico do processo e, se configurado, ao log."""
+    global _log_lido
+    with _trava:
+        if arquivo and not _log_lido:
+            _historico.extend(ler_log(arquivo))
+            _log_lido = True
+        _historico.append(registro)
+        if arquivo:
+            try:
+                with open(arquivo, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            except OSError:
+                pass  # log indisponível: segue só com o histórico em memória
+
+
+def historico():
+    with _trava:
+        return list(_historico)
+
+
+def percentis(registros, chave="total", secao=None):
+    """
+    (p50, p95, n) do tempo total dos registros, ou de uma seção quando
+    `secao` é informada. Retorna None sem registros.
+    """
+    if secao is None:
+        valores = [r[chave] for r in registros if chave in r]
+    else:
+        valores = [r["secoes"][secao] for r in registros if secao in r.get("secoes", {})]
+    if not valores:
+        return None
+    p50, p95 = np.percentile(valores, [50, 95])
+    return p50, p95, len(valores)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    caminho = argv[0] if argv else ARQUIVO_LOG
+    if not caminho:
+        print("Informe o arquivo de log (ou defina CAMFRIGO_LOG_DESEMPENHO).")
+        return 1
+    registros = ler_log(caminho, limite=None)
+    if not registros:
+        print(f"Nenhum registro em {caminho}.")
+        return 1
+    print(f"{len(registros)} reruns em {caminho}")
+    total = percentis(registros)
+    print(f"{'total':<28} p50 {total[0] * 1000:8.0f} ms   p95 {total[1] * 1000:8.0f} ms")
+    secoes = dict.fromkeys(nome for r in registros for nome in r.get("secoes", {}))
+    for secao in secoes:
+        p50, p95, n = percentis(registros, secao=secao)
+        print(f"  {secao:<26} p50 {p50 * 1000:8.0f} ms   p95 {p95 * 1000:8.0f} ms   ({n})")
+    picos = [r["pico_memoria"] for r in registros if r.get("pico_memoria") is not None]
+    if picos:
+        print(f"{'pico de memória':<28} p50 {np.percentile(picos, 50) / 2**20:8.1f} MB   "
+              f"máx {max(picos) / 2**20:8.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
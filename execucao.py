@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Execução concorrente das etapas pesadas do dashboard.
+
+Leitura das planilhas, agregações, índices de palavras, figuras e word clouds
+não dependem umas das outras entre seções, então são enviadas a um pool de
+threads compartilhado pelo processo enquanto a thread principal do Streamlit
+desenha cabeçalho, tabelas e placeholders. As tarefas não podem chamar
+funções do Streamlit.
+
+Execucao(paralelo=False) executa cada tarefa na hora, na ordem em que é
+submetida, reproduzindo o caminho serial para comparação dos tempos.
+
+Dentro de uma tarefa, os módulos marcam as etapas internas (leitura do
+Excel, padronização, groupby, tokenização, WordCloud, serialização do
+plotly) com `with etapa("nome"):`; os tempos ficam registrados sob a
+tarefa. Fora de uma tarefa, etapa() não mede nada.
+
+Com memoria=True o tracemalloc é ligado e cada seção registra o pico de
+memória alocada acima do início da seção. No modo paralelo as tarefas em
+segundo plano entram no pico da seção que estiver aberta; o pico por tarefa
+só é registrado no modo serial. O tracemalloc tem um único pico por
+processo, então só uma execução por vez mede memória: enquanto outra sessão
+mede, a execução segue sem medir (memoria_ocupada). O tracemalloc é desligado
+ao fim da medição se foi ligado por ela.
+"""
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+MAX_TRABALHADORES = int(os.environ.get("CAMFRIGO_TRABALHADORES", min(8, (os.cpu_count() or 1) + 2)))
+
+_pool = None
+_trava = threading.Lock()
+# Lista de etapas da tarefa em execução na thread corrente
+_local = threading.local()
+# Vez de medir memória: livre quando nenhuma execução está medindo
+_trava_memoria = threading.Lock()
+
+
+def _obter_pool():
+    global _pool
+    with _trava:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_TRABALHADORES, thread_name_prefix="camfrigo")
+        return _pool
+
+
+def _liberar_memoria(iniciou_tracemalloc):
+    """Devolve a vez de medir memória, desligando o tracemalloc se a medição o ligou."""
+    if iniciou_tracemalloc:
+        tracemalloc.stop()
+    _trava_memoria.release()
+
+
+@contextmanager
+def etapa(nome):
+    """Mede o bloco como uma etapa da tarefa corrente (se houver)."""
+    etapas = getattr(_local, "etapas", None)
+    if etapas is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        etapas.append((nome, time.perf_counter() - inicio))
+
+
+class Execucao:
+    """
+    Agenda as tarefas de um rerun e registra os tempos de tarefas (na thread
+    que as executa) e de seções (tempo de parede da thread principal).
+    """
+
+    def __init__(self, paralelo=True, memoria=False):
+        self.paralelo = paralelo
+        self.memoria_ocupada = memoria and not _trava_memoria.acquire(blocking=False)
+        self.memoria = memoria = memoria and not self.memoria_ocupada
+        self.tempos_tarefas = {}
+        self.etapas_tarefas = {}
+        self.tempos_secoes = {}
+        self.memoria_tarefas = {}
+        self.memoria_secoes = {}
+        self.pico_memoria = None
+        self._secao = None
+        if memoria:
+            iniciou = not tracemalloc.is_tracing()
+            if iniciou:
+                tracemalloc.start()
+            # Liberada em encerrar() ou, se o rerun for interrompido, quando a execução for descartada
+            self._liberar_memoria = weakref.finalize(self, _liberar_memoria, iniciou)
+            self._base_total = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            self._pico_total = self._pico_secao = self._base_total
+        self.inicio = time.perf_counter()
+
+    def _ler_pico(self):
+        """Pico desde a última leitura, acumulado nos picos da seção e do rerun."""
+        atual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._pico_secao = max(self._pico_secao, pico)
+        self._pico_total = max(self._pico_total, pico)
+        return atual, pico
+
+    def submeter(self, nome, funcao, *args, **kwargs):
+        """Agenda funcao(*args, **kwargs) e devolve um Future com o resultado."""
+        medir_memoria = self.memoria and not self.paralelo
+
+        def medir():
+            _local.etapas = etapas = []
+            if medir_memoria:
+                base, _ = self._ler_pico()
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self.tempos_tarefas[nome] = time.perf_counter() - inicio
+                self.etapas_tarefas[nome] = etapas
+                _local.etapas = None
+                if medir_memoria:
+                    self.memoria_tarefas[nome] = self._ler_pico()[1] - base
+
+        if self.paralelo:
+            return _obter_pool().submit(medir)
+        futuro = Future()
+        try:
+            futuro.set_result(medir())
+        except Exception as e:
+            futuro.set_exception(e)
+        return futuro
+
+    def iniciar_secao(self, nome):
+        """Encerra a seção corrente (se houver) e começa a medir a próxima."""
+        agora = time.perf_counter()
+        self._fechar_secao(agora)
+        base = None
+        if self.memoria:
+            base, _ = self._ler_pico()
+            self._pico_secao = base
+        self._secao = (nome, agora, base)
+
+    def encerrar(self):
+        """Encerra a medição da última seção (e do pico de memória do rerun)."""
+        self._fechar_secao(time.perf_counter())
+        if self.memoria and self._liberar_memoria.alive:
+            self._ler_pico()
+            self.pico_memoria = self._pico_total - self._base_total
+            self._liberar_memoria()
+
+    def _fechar_secao(self, agora):
+        if self._secao is not None:
+            nome, inicio, base = self._secao
+            self.tempos_secoes[nome] = agora - inicio
+            if self.memoria:
+                self._ler_pico()
+                self.memoria_secoes[nome] = self._pico_secao - base
+            self._secao = None
+
+    def tempo_total(self):
+        return time.perf_counter() - self.inicio
+
+    def tempo_serial(self):
+        """Soma dos tempos das tarefas: o que custariam executadas em sequência."""
+        return sum(self.tempos_tarefas.values())
@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+"""
+Exportação do "Relatório de Vistorias Técnicas" em arquivos estáticos, sem
+Streamlit.
+
+Cada relatório é um HTML autocontido (logo, gráficos e word clouds embutidos
+em base64) com as mesmas seções do dashboard: indicadores, tabelas, gráficos
+e word clouds. Os gráficos saem como PNG quando o kaleido está instalado;
+sem ele, são embutidos como plotly interativo (o plotly.js entra uma única
+vez por arquivo). O PDF é gerado a partir do HTML pelo weasyprint, se
+instalado, e exige o kaleido para conter os gráficos.
+
+kaleido e weasyprint não fazem parte da instalação do dashboard; para a
+exportação completa use `pip install -r requirements-exportacao.txt`. O
+weasyprint precisa ainda das bibliotecas Pango do sistema (no Debian,
+`apt install libpango-1.0-0 libpangoft2-1.0-0`).
+
+Em lote (--por-om), é gerado o relatório consolidado e um por OM. As
+planilhas são lidas e agregadas uma única vez no processo principal; os
+agregados e os índices de palavras seguem para cada processo do pool na
+inicialização, e o relatório de cada OM é apenas um recorte do cubo
+(agregacoes.recortar_om), sem novo groupby sobre as linhas.
+
+Uso:
+
+    python exportacao.py [--dados PASTA] [--campanhas C1 C2 ...] [--saida PASTA]
+        [--por-om | --om OM1 OM2 ...] [--pdf] [--processos N] [--fatias N]
+"""
+import argparse
+import base64
+import html
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+try:
+    import kaleido  # noqa: F401  (usado pelo plotly em fig.to_image)
+except ImportError:  # sem kaleido, os gráficos são embutidos como plotly interativo
+    kaleido = None
+
+try:
+    from weasyprint import HTML as _HTMLWeasy
+except (ImportError, OSError):  # weasyprint é opcional: sem ele só o HTML é gerado
+    # OSError: pacote instalado, mas sem as bibliotecas do sistema (Pango/GObject)
+    _HTMLWeasy = None
+
+from agregacoes import agregar_resumo, agregar_servicos, recortar_om
+from carregamento import ligar_copy_on_write
+from formatacao import formatador_moeda, formatar_moeda
+from frequencias import STOPWORDS, frequencias_selecionadas, indexar_tokens
+from graficos import TOP_N_PIZZA, figuras_resumo, figuras_servicos
+from nuvem_palavras import renderizar_nuvem
+from pipeline import colunas_texto_problemas
+from registro import carregar_campanhas, descobrir_campanhas
+from tabelas import estilo_estado
+
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_LOGO = os.path.join(PASTA_APP, "Logo_Colog_Sem_Fundo.png")
+# Tabelas detalhadas maiores que isso são truncadas no arquivo exportado
+LIMITE_LINHAS_TABELA = int(os.environ.get("CAMFRIGO_EXPORTACAO_LINHAS", 5000))
+NOME_CONSOLIDADO = "relatorio_consolidado"
+
+RENOMEAR_RESUMO = {
+    "om": "OM",
+    "estado_geral": "ESTADO GERAL",
+    "solucao_proposta": "SOLUÇÃO PROPOSTA",
+    "valor": "VALOR ESTIMADO",
+    "nr_opus": "NR OPUS",
+}
+RENOMEAR_SOLUCAO = {
+    "solucao_proposta": "Solução",
+    "total": "Total",
+    "media": "Média",
+    "minimo": "Mínimo",
+    "maximo": "Máximo",
+    "quantidade": "Quantidade",
+}
+
+ESTILO = """
+body { font-family: sans-serif; margin: 2em auto; max-width: 1100px; color: #222; }
+header { display: flex; align-items: center; gap: 1.5em; }
+h1 { margin: 0; } h2 { border-bottom: 2px solid #ccc; padding-bottom: .2em; margin-top: 2em; }
+.metricas { display: flex; flex-wrap: wrap; gap: 1em; }
+.metrica { border: 1px solid #ddd; border-radius: 6px; padding: .6em 1em; min-width: 12em; }
+.metrica span { display: block; font-size: .85em; color: #666; }
+.metrica strong { font-size: 1.3em; }
+table { border-collapse: collapse; font-size: .85em; margin: .5em 0; }
+th, td { border: 1px solid #ddd; padding: .25em .5em; }
+th { background: #f3f3f3; }
+img { max-width: 100%; }
+.aviso { color: #666; font-style: italic; }
+footer { text-align: center; font-size: 12px; margin-top: 3em; }
+"""
+
+# Dados compartilhados pelos relatórios de um lote (preenchido em cada processo do pool)
+_contexto = None
+
+
+def data_relatorio():
+    """Data por extenso em pt-BR quando o locale existe; senão dd/mm/aaaa."""
+    import locale
+    try:
+        locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
+    except locale.Error:
+        return datetime.now().strftime("%d/%m/%Y")
+    return datetime.now().strftime("%d de %B de %Y")
+
+
+def nome_arquivo(om):
+    """Nome de arquivo (sem extensão) do relatório de uma OM."""
+    return "relatorio_" + (re.sub(r"[^\w-]+", "_", str(om)).strip("_") or "om")
+
+
+def nomes_arquivos(oms):
+    """
+    {om: nome de arquivo} sem repetições. OMs que resultam no mesmo nome
+    ("Ba Adm/QGEx" e "Ba Adm QGEx") recebem um sufixo numérico na ordem de
+    `oms`; a comparação ignora maiúsculas, como os sistemas de arquivos do
+    Windows e do macOS, e o nome do consolidado fica reservado.
+    """
+    usados = {NOME_CONSOLIDADO.lower()}
+    nomes = {}
+    for om in oms:
+        base = nome = nome_arquivo(om)
+        sufixo = 1
+        while nome.lower() in usados:
+            sufixo += 1
+            nome = f"{base}_{sufixo}"
+        usados.add(nome.lower())
+        nomes[om] = nome
+    return nomes
+
+
+def _png_base64(dados):
+    return "data:image/png;base64," + base64.b64encode(dados).decode("ascii")
+
+
+def _imagem(array):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, format="PNG")
+    return f'<img src="{_png_base64(buffer.getvalue())}">'
+
+
+def _figura(fig, estado):
+    """Figura plotly como <img> (kaleido) ou, sem kaleido, como div interativo."""
+    if fig is None:
+        return '<p class="aviso">Não há dados para este gráfico.</p>'
+    if kaleido is not None:
+        return f'<img src="{_png_base64(fig.to_image(format="png", scale=1))}">'
+    incluir_js = not estado.get("plotlyjs")
+    estado["plotlyjs"] = True
+    return fig.to_html(full_html=False, include_plotlyjs=incluir_js)
+
+
+def _metricas(itens):
+    blocos = "".join(f'<div class="metrica"><span>{html.escape(rotulo)}</span><strong>{html.escape(valor)}'
+                     f'</strong></div>' for rotulo, valor in itens)
+    return f'<div class="metricas">{blocos}</div>'
+
+
+def _tabela(df, renomear=None, formatos=None, colorir_estado=False):
+    if df.empty:
+        return '<p class="aviso">Nenhuma linha para exibir.</p>'
+    aviso = ""
+    if len(df) > LIMITE_LINHAS_TABELA:
+        aviso = (f'<p class="aviso">Exibindo as primeiras {LIMITE_LINHAS_TABELA} de {len(df)} linhas.</p>')
+        df = df.iloc[:LIMITE_LINHAS_TABELA]
+    df = df.rename(columns=renomear or {})
+    # Textos das planilhas (células e cabeçalhos) entram escapados no HTML
+    estilo = (df.style.format(na_rep="", escape="html").format_index(escape="html", axis=1)
+              .format({col: f for col, f in (formatos or {}).items() if col in df.columns},
+                      na_rep="", escape="html"))
+    if colorir_estado and "ESTADO GERAL" in df.columns:
+        estilo = estilo.apply(estilo_estado, subset=["ESTADO GERAL"])
+    return estilo.hide(axis="index").to_html() + aviso
+
+
+def _secao_resumo(df_resumo, agregados, top_n, estado):
+    n_oms = df_resumo["om"].nunique() if "om" in df_resumo.columns else 0
+    partes = [f"<h2>Resumo e Análise – {n_oms} OMs (Resumo)</h2>"]
+    if agregados is None:
+        partes.append('<p class="aviso">Arquivo de resumo não contém dados.</p>')
+        return partes
+    geral = agregados["geral"]
+    partes.append("<h3>Indicadores Gerais</h3>")
+    partes.append(_metricas([
+        ("Total Geral", formatar_moeda(geral["total"])),
+        ("Média Geral", formatar_moeda(geral["media"])),
+        ("Mínimo Geral", formatar_moeda(geral["minimo"])),
+        ("Máximo Geral", formatar_moeda(geral["maximo"])),
+    ]))
+    partes.append("<h3>Indicadores por Solução</h3>")
+    por_solucao = agregados["por_solucao"][list(RENOMEAR_SOLUCAO)]
+    partes.append(_tabela(por_solucao, RENOMEAR_SOLUCAO, {
+        "Total": formatador_moeda(),
+        "Média": formatador_moeda(),
+        "Mínimo": formatador_moeda("⬇️"),
+        "Máximo": formatador_moeda("⬆️"),
+    }))
+    partes.append("<h3>Tabela Detalhada dos Dados (Resumo)</h3>")
+    partes.append(_tabela(df_resumo, RENOMEAR_RESUMO, {"VALOR ESTIMADO": formatador_moeda()},
+                          colorir_estado=True))
+    figuras, _ = figuras_resumo(agregados, top_n)
+    for chave, titulo in (("qtd_om", "Quantidade por OM"), ("qtd_sol", "Quantidade por Solução"),
+                          ("val_om", "Valor por OM"), ("val_sol", "Valor por Solução"),
+                          ("barras", "Valor por OM (por Solução)")):
+        partes.append(f"<h3>{titulo}</h3>")
+        partes.append(_figura(figuras[chave], estado))
+    return partes
+
+
+def _secao_servicos(df_servicos, agregados, top_n, estado):
+    n_oms = df_servicos["om"].nunique() if "om" in df_servicos.columns else 0
+    partes = [f"<h2>Análise de Serviços – {n_oms} OMs (Serviços)</h2>"]
+    if agregados is None:
+        partes.append('<p class="aviso">Arquivo de serviços não contém dados.</p>')
+        return partes
+    partes.append("<h3>Indicadores por Disciplina</h3>")
+    total_geral = agregados["geral"]["total"]
+    for linha in agregados["por_disciplina"].itertuples(index=False):
+        perc = (linha.total / total_geral * 100) if total_geral > 0 else 0
+        partes.append(f"<h4>{html.escape(str(linha.disciplina))}</h4>")
+        partes.append(_metricas([
+            ("Total", f"{formatar_moeda(linha.total)} ({perc:.1f}%)"),
+            (f"Mínimo ({linha.om_minimo})", f"{formatar_moeda(linha.minimo)} ⬇️"),
+            (f"Máximo ({linha.om_maximo})", f"{formatar_moeda(linha.maximo)} ⬆️"),
+        ]))
+    figuras, _ = figuras_servicos(agregados, top_n)
+    partes.append("<h3>Distribuição de Valor por Disciplina</h3>")
+    partes.append(_figura(figuras["pizza_disciplina"], estado))
+    partes.append("<h3>Valor por OM (Segmentado por Disciplina)</h3>")
+    partes.append(_figura(figuras["barras"], estado))
+    return partes
+
+
+def _secao_problemas(df_problemas, indices, selecionados):
+    partes = ["<h2>Análise dos Principais Problemas</h2>"]
+    if df_problemas.empty:
+        partes.append('<p class="aviso">Arquivo de principais problemas não contém dados.</p>')
+        return partes
+    partes.append("<h3>Tabela dos Principais Problemas</h3>")
+    partes.append(_tabela(df_problemas))
+    for titulo, col in zip(("Word Cloud - Frequência de Defeitos", "Word Cloud - Distribuição de Soluções"),
+                           colunas_texto_problemas(df_problemas)):
+        partes.append(f"<h3>{titulo}</h3>")
+        freq = frequencias_selecionadas(indices[col], selecionados, STOPWORDS) if col else None
+        if freq:
+            partes.append(_imagem(renderizar_nuvem(freq)))
+        else:
+            partes.append('<p class="aviso">Não há dados para gerar a word cloud.</p>')
+    return partes
+
+
+def montar_html(contexto, om=None):
+    """
+    HTML autocontido do relatório consolidado (om=None) ou de uma única OM,
+    a partir do contexto montado por preparar_contexto.
+    """
+    df_resumo, df_servicos, df_problemas = contexto["resumo"], contexto["servicos"], contexto["problemas"]
+    agregados_resumo, agregados_servicos = contexto["agregados_resumo"], contexto["agregados_servicos"]
+    selecionados = None
+    if om is not None:
+        df_resumo = _linhas_om(df_resumo, om)
+        df_servicos = _linhas_om(df_servicos, om)
+        df_problemas = _linhas_om(df_problemas, om)
+        if agregados_resumo is not None:
+            agregados_resumo = recortar_om(agregados_resumo, om) if not df_resumo.empty else None
+        if agregados_servicos is not None:
+            agregados_servicos = recortar_om(agregados_servicos, om) if not df_servicos.empty else None
+        selecionados = [om]
+
+    estado = {}
+    top_n = contexto["top_n"]
+    data = contexto["data"]
+    escopo = "Consolidado" if om is None else f"OM: {om}"
+    logo = ""
+    if contexto["logo"]:
+        logo = f'<img src="{_png_base64(contexto["logo"])}" width="120">'
+    corpo = [
+        f"<header>{logo}<div><h1>RELATÓRIO DE VISTORIAS TÉCNICAS</h1>"
+        "<h3>Câmaras Frias de OM da Guarnição de Brasília</h3>"
+        f"<p>{html.escape(escopo)} – Campanhas: {html.escape(', '.join(contexto['campanhas']))}<br>"
+        f"Data do Relatório: {html.escape(data)}</p></div></header>"
+    ]
+    corpo += _secao_resumo(df_resumo, agregados_resumo, top_n, estado)
+    corpo += _secao_servicos(df_servicos, agregados_servicos, top_n, estado)
+    corpo += _secao_problemas(df_problemas, contexto["indices"], selecionados)
+    corpo.append("<footer><hr><p>PRODUZIDO POR: TC BRITO</p>"
+                 f"<p style='font-size: 10px;'>Relatório gerado em {html.escape(data)} "
+                 "com base nas vistorias técnicas.</p></footer>")
+    titulo = "Relatório de Vistorias Técnicas - COLOG" + ("" if om is None else f" - {om}")
+    return (f'<!DOCTYPE html>\n<html lang="pt-BR"><head><meta charset="utf-8">'
+            f"<title>{html.escape(titulo)}</title><style>{ESTILO}</style></head>"
+            f"<body>{''.join(corpo)}</body></html>\n")
+
+
+def _linhas_om(df, om):
+    if df.empty or "om" not in df.columns:
+        return df
+    return df[df["om"] == om]
+
+
+def preparar_contexto(df_resumo, df_servicos, df_problemas, campanhas=(), top_n=TOP_N_PIZZA):
+    """
+    Agrega as planilhas e indexa as palavras uma única vez; o resultado é
+    compartilhado por todos os relatórios de um lote.
+    """
+    agregados_resumo = agregados_servicos = None
+    if not df_resumo.empty and "solucao_proposta" in df_resumo.columns:
+        agregados_resumo = agregar_resumo(df_resumo)
+    if not df_servicos.empty and "disciplina" in df_servicos.columns:
+        agregados_servicos = agregar_servicos(df_servicos)
+    indices = {col: indexar_tokens(df_problemas, col) for col in colunas_texto_problemas(df_problemas) if col}
+    logo = None
+    if os.path.exists(ARQUIVO_LOGO):
+        with open(ARQUIVO_LOGO, "rb") as f:
+            logo = f.read()
+    return {
+        "resumo": df_resumo,
+        "servicos": df_servicos,
+        "problemas": df_problemas,
+        "agregados_resumo": agregados_resumo,
+        "agregados_servicos": agregados_servicos,
+        "indices": indices,
+        "campanhas": list(campanhas),
+        "top_n": top_n,
+        "data": data_relatorio(),
+        "logo": logo,
+    }
+
+
+def listar_oms(contexto):
+    """OMs presentes em qualquer uma das três planilhas, em ordem alfabética."""
+    oms = set()
+    for tipo in ("resumo", "servicos", "problemas"):
+        df = contexto[tipo]
+        if "om" in df.columns:
+            oms.update(df["om"].dropna().unique())
+    return sorted(oms, key=str)
+
+
+def exportar(contexto, om, pasta, pdf=False, nome=None):
+    """
+    Grava o relatório (consolidado quando om=None) em `pasta` e devolve a
+    lista de arquivos gerados. `nome` substitui o nome de arquivo padrão
+    (ver nomes_arquivos).
+    """
+    if nome is None:
+        nome = NOME_CONSOLIDADO if om is None else nome_arquivo(om)
+    documento = montar_html(contexto, om)
+    destino = os.path.join(pasta, nome + ".html")
+    with open(destino, "w", encoding="utf-8") as f:
+        f.write(documento)
+    arquivos = [destino]
+    if pdf and _HTMLWeasy is not None:
+        destino_pdf = os.path.join(pasta, nome + ".pdf")
+        _HTMLWeasy(string=documento, base_url=pasta).write_pdf(destino_pdf)
+        arquivos.append(destino_pdf)
+    return arquivos
+
+
+def _iniciar_trabalhador(contexto):
+    global _contexto
+    ligar_copy_on_write()  # processos criados por spawn não herdam a opção
+    _contexto = contexto
+
+
+def _exportar_no_trabalhador(om, nome, pasta, pdf):
+    inicio = time.perf_counter()
+    return om, exportar(_contexto, om, pasta, pdf, nome), time.perf_counter() - inicio
+
+
+def exportar_lote(contexto, oms, pasta, pdf=False, processos=None):
+    """
+    Gera o relatório consolidado e um por OM de `oms`, distribuídos em um
+    pool de `processos` processos (1 executa tudo no processo corrente).
+    Produz (om, arquivos, tempo) à medida que cada relatório fica pronto;
+    om é None para o consolidado.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    # Nomes decididos aqui, antes do pool: dois trabalhadores nunca gravam o mesmo arquivo
+    alvos = [(None, NOME_CONSOLIDADO)] + list(nomes_arquivos(oms).items())
+    processos = min(processos or os.cpu_count() or 1, len(alvos))
+    if processos <= 1:
+        _iniciar_trabalhador(contexto)
+        for om, nome in alvos:
+            yield _exportar_no_trabalhador(om, nome, pasta, pdf)
+        return
+    # O contexto é serializado uma vez por processo, não uma vez por relatório
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador,
+                             initargs=(contexto,)) as pool:
+        futuros = [pool.submit(_exportar_no_trabalhador, om, nome, pasta, pdf) for om, nome in alvos]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta o Relatório de Vistorias Técnicas em HTML/PDF.")
+    parser.add_argument("--dados", default=os.environ.get("CAMFRIGO_DADOS", PASTA_APP),
+                        help="raiz das planilhas TAB_VT_CAMFRIGO_* (padrão: CAMFRIGO_DADOS ou a pasta do script)")
+    parser.add_argument("--campanhas", nargs="+", help="campanhas incluídas (padrão: a primeira, como no dashboard)")
+    parser.add_argument("--saida", default="relatorios", help="pasta dos relatórios gerados")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--por-om", action="store_true", help="gera também um relatório para cada OM")
+    grupo.add_argument("--om", nargs="+", help="gera também os relatórios destas OMs")
+    parser.add_argument("--pdf", action="store_true", help="gera também o PDF (requer weasyprint)")
+    parser.add_argument("--processos", type=int, help="processos do pool (padrão: número de CPUs)")
+    parser.add_argument("--fatias", type=int, default=TOP_N_PIZZA, help="fatias por gráfico de pizza")
+    args = parser.parse_args(argv)
+    ligar_copy_on_write()
+
+    campanhas = descobrir_campanhas(args.dados)
+    if not campanhas:
+        print(f"Nenhuma planilha TAB_VT_CAMFRIGO_* encontrada em {args.dados}.", file=sys.stderr)
+        return 1
+    selecionadas = args.campanhas or list(campanhas)[:1]
+    desconhecidas = [c for c in selecionadas if c not in campanhas]
+    if desconhecidas:
+        print(f"Campanha(s) não encontrada(s): {', '.join(desconhecidas)}. "
+              f"Disponíveis: {', '.join(campanhas)}.", file=sys.stderr)
+        return 1
+    if args.pdf and _HTMLWeasy is None:
+        print("weasyprint indisponível (requirements-exportacao.txt e bibliotecas Pango); "
+              "apenas o HTML será gerado.", file=sys.stderr)
+    elif args.pdf and kaleido is None:
+        print("kaleido não está instalado (requirements-exportacao.txt); "
+              "os gráficos não aparecerão no PDF.", file=sys.stderr)
+
+    inicio = time.perf_counter()
+    planilhas = {}
+    for tipo in ("resumo", "servicos", "problemas"):
+        planilhas[tipo], relatorio = carregar_campanhas(campanhas, selecionadas, tipo)
+        for item in relatorio:
+            if item["erro"] is not None:
+                print(f"[erro] {item['caminho']}: {item['erro']}", file=sys.stderr)
+    contexto = preparar_contexto(planilhas["resumo"], planilhas["servicos"], planilhas["problemas"],
+                                 selecionadas, args.fatias)
+    print(f"Planilhas carregadas e agregadas em {time.perf_counter() - inicio:.2f}s")
+
+    oms = listar_oms(contexto) if args.por_om else (args.om or [])
+    for om, arquivos, tempo in exportar_lote(contexto, oms, args.saida, args.pdf, args.processos):
+        print(f"[{'consolidado' if om is None else om}] {', '.join(arquivos)} ({tempo:.2f}s)")
+    print(f"{len(oms) + 1} relatório(s) em {time.perf_counter() - inicio:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Formatação de valores monetários no padrão brasileiro (R$ 1.234,56).
+
+formatar_moeda formata um único valor; formatar_moedas formata um array
+inteiro de uma vez, formatando apenas os valores distintos e reaproveitando
+os rótulos já produzidos em chamadas anteriores.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+# Troca "," por "." e vice-versa em uma única passada (padrão en-US -> pt-BR)
+_TROCA_SEPARADORES = str.maketrans(",.", ".,")
+
+# Limite de rótulos memorizados (valores distintos)
+TAMANHO_MEMORIA = 65536
+
+
+# Função para formatar valores como moeda
+@lru_cache(maxsize=TAMANHO_MEMORIA)
+def formatar_moeda(valor):
+    return f"R$ {valor:,.2f}".translate(_TROCA_SEPARADORES)
+
+
+def formatar_moedas(valores, sufixo=""):
+    """
+    Formata um array/Series de números como moeda e retorna uma lista de rótulos
+    na mesma ordem. Valores repetidos são formatados uma única vez.
+    """
+    valores = np.asarray(valores, dtype="float64")
+    if valores.size == 0:
+        return []
+    distintos, posicoes = np.unique(valores, return_inverse=True)
+    rotulos = np.array([formatar_moeda(float(v)) + sufixo for v in distintos], dtype=object)
+    return rotulos[posicoes.reshape(-1)].tolist()
+
+
+def formatador_moeda(sufixo=""):
+    """Retorna um formatador por célula para Styler.format, mantendo a coluna numérica."""
+    if not sufixo:
+        return formatar_moeda
+    return lambda valor: f"{formatar_moeda(valor)} {sufixo}"
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de frequência de palavras para as word clouds dos Principais Problemas.
+
+O texto de cada planilha é tokenizado uma única vez por versão (cada texto
+distinto passa pelo tokenizador só uma vez) e as contagens ficam agregadas
+por OM. Filtrar por OM passa a ser apenas somar os contadores das OMs
+selecionadas, sem tokenizar de novo.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+import pandas as pd
+
+from agregacoes import em_cache
+from execucao import etapa
+
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9\s]')
+
+# Stopwords padrão do pacote wordcloud (wordcloud.STOPWORDS), copiadas para
+# não importar o wordcloud só para montar a lista
+_STOPWORDS_WORDCLOUD = (
+    'a', 'about', 'above', 'after', 'again', 'against', 'all', 'also', 'am', 'an', 'and', 'any',
+    'are', "aren't", 'as', 'at', 'be', 'because', 'been', 'before', 'being', 'below', 'between',
+    'both', 'but', 'by', 'can', "can't", 'cannot', 'com', 'could', "couldn't", 'did', "didn't",
+    'do', 'does', "doesn't", 'doing', "don't", 'down', 'during', 'each', 'else', 'ever', 'few',
+    'for', 'from', 'further', 'get', 'had', "hadn't", 'has', "hasn't", 'have', "haven't", 'having',
+    'he', "he'd", "he'll", "he's", 'hence', 'her', 'here', "here's", 'hers', 'herself', 'him',
+    'himself', 'his', 'how', "how's", 'however', 'http', 'i', "i'd", "i'll", "i'm", "i've", 'if',
+    'in', 'into', 'is', "isn't", 'it', "it's", 'its', 'itself', 'just', 'k', "let's", 'like', 'me',
+    'more', 'most', "mustn't", 'my', 'myself', 'no', 'nor', 'not', 'of', 'off', 'on', 'once',
+    'only', 'or', 'other', 'otherwise', 'ought', 'our', 'ours', 'ourselves', 'out', 'over', 'own',
+    'r', 'same', 'shall', "shan't", 'she', "she'd", "she'll", "she's", 'should', "shouldn't",
+    'since', 'so', 'some', 'such', 'than', 'that', "that's", 'the', 'their', 'theirs', 'them',
+    'themselves', 'then', 'there', "there's", 'therefore', 'these', 'they', "they'd", "they'll",
+    "they're", "they've", 'this', 'those', 'through', 'to', 'too', 'under', 'until', 'up', 'very',
+    'was', "wasn't", 'we', "we'd", "we'll", "we're", "we've", 'were', "weren't", 'what', "what's",
+    'when', "when's", 'where', "where's", 'which', 'while', 'who', "who's", 'whom', 'why', "why's",
+    'with', "won't", 'would', "wouldn't", 'www', 'you', "you'd", "you'll", "you're", "you've",
+    'your', 'yours', 'yourself', 'yourselves'
+)
+
+# Stopwords personalizadas (acrescentamos "a", "há" e "o")
+STOPWORDS = frozenset(_STOPWORDS_WORDCLOUD + (
+    "de", "da", "do", "que", "e", "com", "em", "as", "os", "à", "ao", "nas", "nos", "um", "uma",
+    "para", "dos", "das", "seu", "sua", "seus", "suas", "ele", "ela", "eles", "elas", "esta", "este",
+    "estes", "estas", "isto", "aquilo", "aquele", "aquela", "aqueles", "aquelas", "isso", "aquilo",
+    "entre", "sobre", "até", "sem", "com", "contra", "por", "perante", "desde", "trás", "sob",
+    "durante", "mediante", "exceto", "salvo", "fora", "após", "bem", "como", "mal", "assim",
+    "cada", "qual", "quais", "onde", "quando", "quanto", "quantos", "quantas", "tanto", "tantos", "tantas",
+    "nenhum", "nenhuma", "nenhuns", "nenhumas", "todo", "toda", "todos", "todas", "muitos", "muitas",
+    "poucos", "poucas", "algum", "alguma", "alguns", "algumas", "outro", "outra", "outros", "outras",
+    "mesmo", "mesma", "mesmos", "mesmas", "próprio", "própria", "próprios", "próprias", "tal", "tais",
+    "se", "mas", "pois", "porque", "portanto", "logo", "então", "nem", "contudo", "todavia", "entretanto",
+    "não", "sim", "ainda", "já", "apenas", "somente", "também", "muito", "pouco", "mais", "menos",
+    "quem", "cujo", "cuja", "cujos", "cujas",
+    "a", "há", "o"
+))
+
+
+def tokenizar(texto):
+    """
+    Minúsculas, sem acentos e sem pontuação, dividido em palavras.
+
+    Equivale a lower + remover_acentos + re.sub da tokenize_and_count original
+    do dashboard (conferido em tests/test_frequencias.py): as marcas combinantes
+    que remover_acentos descarta já não pertencem a [a-z0-9\\s], então a
+    própria expressão regular as remove.
+    """
+    return _NAO_ALFANUMERICO.sub('', unicodedata.normalize('NFD', texto.lower())).split()
+
+
+def _indexar(df, coluna, coluna_grupo):
+    grupos = df[coluna_grupo] if coluna_grupo in df.columns else pd.Series(None, index=df.index)
+    indice = {}
+    por_texto = {}
+    for grupo, texto in zip(grupos.tolist(), df[coluna].tolist()):
+        if pd.isna(texto):
+            continue
+        contagem = por_texto.get(texto)
+        if contagem is None:
+            contagem = por_texto[texto] = Counter(tokenizar(texto))
+        # OM vazia fica sob None e só entra quando não há filtro por OM
+        chave = None if pd.isna(grupo) else grupo
+        indice.setdefault(chave, Counter()).update(contagem)
+    return indice
+
+
+def indexar_tokens(df, coluna, coluna_grupo="om"):
+    """
+    Retorna {om: Counter(palavra -> ocorrências)} para a coluna de texto,
+    em cache pela versão da planilha. Inclui stopwords; elas são descartadas
+    em frequencias_selecionadas.
+    """
+    def calcular(d):
+        with etapa("Tokenização"):
+            return _indexar(d, coluna, coluna_grupo)
+    return em_cache(df, ("tokens", coluna, coluna_grupo), calcular)
+
+
+def frequencias_selecionadas(indice, selecionados=None, stopwords=()):
+    """
+    Soma as contagens das OMs selecionadas (todas, se `selecionados` for None)
+    e devolve um dicionário palavra -> frequência sem as stopwords.
+    """
+    total = Counter()
+    if selecionados is None:
+        selecionados = indice.keys()
+    for grupo in selecionados:
+        contagem = indice.get(grupo)
+        if contagem:
+            total.update(contagem)
+    return {palavra: n for palavra, n in total.items() if palavra not in stopwords}
+
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Construção das figuras plotly das seções Resumo e Serviços.
+
+As funções recebem os agregados de agregacoes.py e não chamam o Streamlit,
+de modo que podem rodar fora da thread principal. Gráficos sem dados vêm
+como None. O plotly é importado dentro das funções, na primeira figura
+construída, para não pesar na partida do app.
+
+As pizzas mostram no máximo `top_n` fatias; as demais são somadas em
+"Outros", o que mantém pequeno o JSON enviado ao navegador quando há muitas
+OMs. Cada função devolve (figuras, metricas), com o tempo de construção e o
+tamanho do JSON serializado de cada gráfico.
+"""
+import json
+import os
+import time
+
+import pandas as pd
+
+from execucao import etapa
+from formatacao import formatar_moeda, formatar_moedas
+
+TOP_N_PIZZA = int(os.environ.get("CAMFRIGO_PIZZA_TOP_N", 16))
+ROTULO_OUTROS = "Outros"
+
+
+def _top_n(df, valores, nomes, top_n):
+    """Mantém as `top_n` maiores fatias e soma o restante em uma fatia "Outros"."""
+    if not top_n or len(df) <= top_n:
+        return df
+    ordenado = df.sort_values(valores, ascending=False, kind="stable")
+    principais = ordenado.iloc[:top_n]
+    outros = pd.DataFrame({nomes: [ROTULO_OUTROS], valores: [ordenado[valores].iloc[top_n:].sum()]})
+    return pd.concat([principais[[nomes, valores]].astype({nomes: object}), outros], ignore_index=True)
+
+
+def _medir(metricas, chave, construir, *args):
+    """Constrói a figura e registra o tempo gasto e o tamanho do JSON (bytes)."""
+    inicio = time.perf_counter()
+    with etapa(f"Figura {chave}"):
+        fig = construir(*args)
+    fim = time.perf_counter()
+    tamanho = 0
+    if fig is not None:
+        # Mesma serialização usada pelo st.plotly_chart
+        import plotly.utils
+        with etapa(f"Serialização {chave}"):
+            tamanho = len(json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder).encode("utf-8"))
+    metricas[chave] = {"tempo": fim - inicio, "bytes": tamanho, "instante": fim}
+    return fig
+
+
+def _pizza(df, valores, nomes, titulo, top_n=None):
+    if df.empty:
+        return None
+    df = _top_n(df, valores, nomes, top_n)
+    import plotly.express as px
+    fig = px.pie(df, values=valores, names=nomes, title=titulo, hole=0.3)
+    fig.update_traces(textinfo='percent+label', pull=[0.05]*len(df))
+    return fig
+
+
+def _barras_om_solucao(cubo, media_geral):
+    df_om_val = (cubo[cubo["om"].notna() & cubo["solucao_proposta"].notna()]
+                 [["om", "solucao_proposta", "total"]].rename(columns={"total": "valor"}))
+    if df_om_val.empty:
+        return None
+    import plotly.express as px
+    import plotly.graph_objects as go
+    df_om_val = df_om_val.sort_values("valor", ascending=True)
+    # Gerar dicionário de cores com base nas soluções únicas
+    unique_sols = sorted(df_om_val["solucao_proposta"].unique())
+    cores_sol = {sol: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)]
+                 for i, sol in enumerate(unique_sols)}
+    cores = df_om_val["solucao_proposta"].astype(object).map(cores_sol).fillna("#808080")
+    fig_bar = go.Figure()
+    fig_bar.add_trace(go.Bar(
+        y=df_om_val["om"],
+        x=df_om_val["valor"],
+        orientation='h',
+        marker_color=cores,
+        text=formatar_moedas(df_om_val["valor"]),
+        textposition="auto",
+        hovertemplate="OM: %{y}<br>Valor: %{x:.2f}<extra></extra>"
+    ))
+    fig_bar.add_vline(x=media_geral, line_dash="dash", line_color="red",
+                      annotation_text=f"Média Geral: {formatar_moeda(media_geral)}",
+                      annotation_position="bottom right")
+    fig_bar.update_layout(
+        xaxis_title="Valor (R$)",
+        yaxis_title="OM",
+        height=max(400, len(df_om_val)*30)
+    )
+    return fig_bar
+
+
+def figuras_resumo(agregados, top_n=TOP_N_PIZZA):
+    """Figuras da seção Resumo: quatro pizzas e as barras de valor por OM/solução."""
+    por_om = agregados["por_om"]
+    por_solucao = agregados["por_solucao"]
+    contagem_om = (por_om[["om", "linhas"]].rename(columns={"linhas": "quantidade"})
+                   .sort_values("quantidade", ascending=False, kind="stable"))
+    contagem_sol = (por_solucao[["solucao_proposta", "linhas"]]
+                    .rename(columns={"solucao_proposta": "solucao", "linhas": "quantidade"})
+                    .sort_values("quantidade", ascending=False, kind="stable"))
+    valor_om = por_om[["om", "total"]].rename(columns={"total": "valor"})
+    valor_sol = por_solucao[["solucao_proposta", "total"]].rename(columns={"total": "valor"})
+    metricas = {}
+    figuras = {
+        "qtd_om": _medir(metricas, "qtd_om", _pizza, contagem_om, "quantidade", "om",
+                         "Distribuição de Quantidade por OM", top_n),
+        "qtd_sol": _medir(metricas, "qtd_sol", _pizza, contagem_sol, "quantidade", "solucao",
+                          "Distribuição de Quantidade por Solução", top_n),
+        "val_om": _medir(metricas, "val_om", _pizza, valor_om, "valor", "om",
+                         "Distribuição de Valor por OM", top_n),
+        "val_sol": _medir(metricas, "val_sol", _pizza, valor_sol, "valor", "solucao_proposta",
+                          "Distribuição de Valor por Solução", top_n),
+        "barras": _medir(metricas, "barras", _barras_om_solucao, agregados["cubo"],
+                         agregados["geral"]["media"]),
+    }
+    return figuras, metricas
+
+
+def _barras_om_disciplina(cubo):
+    om_disc = (cubo[cubo["om"].notna() & cubo["disciplina"].notna()]
+               [["om", "disciplina", "total"]].rename(columns={"total": "valor"}))
+    fig_bar_serv = None
+    if not om_disc.empty:
+        import plotly.express as px
+        fig_bar_serv = px.bar(om_disc, x="valor", y="om", color="disciplina",
+                              orientation="h",
+                              title="Valor por OM Segmentado por Disciplina",
+                              labels={"valor": "Valor (R$)", "om": "OM", "disciplina": "Disciplina"},
+                              barmode="stack")
+        fig_bar_serv.update_layout(xaxis_tickformat=',.2f')
+    return fig_bar_serv
+
+
+def figuras_servicos(agregados, top_n=TOP_N_PIZZA):
+    """Figuras da seção Serviços: pizza por disciplina e barras empilhadas por OM."""
+    valor_disc = agregados["por_disciplina"][["disciplina", "total"]].rename(columns={"total": "valor"})
+    metricas = {}
+    figuras = {
+        "pizza_disciplina": _medir(metricas, "pizza_disciplina", _pizza, valor_disc, "valor", "disciplina",
+                                   "Valor Total por Disciplina", top_n),
+        "barras": _medir(metricas, "barras", _barras_om_disciplina, agregados["cubo"]),
+    }
+    return figuras, metricas
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Renderização das word clouds com cache.
+
+O layout do WordCloud é a etapa mais cara do dashboard, então cada imagem é
+guardada em um cache LRU em memória, indexado pela impressão digital das
+frequências (apenas as `max_palavras` mais frequentes, que são as únicas
+desenhadas) e pelos parâmetros de renderização. Opcionalmente as imagens são
+gravadas em disco (PNG) para reaproveitamento entre sessões e reinícios.
+
+Configuração por variáveis de ambiente:
+  CAMFRIGO_NUVEM_LARGURA / CAMFRIGO_NUVEM_ALTURA  tamanho da tela (padrão 800x400)
+  CAMFRIGO_NUVEM_MAX_PALAVRAS                     limite de palavras (padrão 200)
+  CAMFRIGO_CACHE_DIR                              pasta do cache em disco
+                                                  (vazio desativa o cache em disco)
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from execucao import etapa
+
+LARGURA = int(os.environ.get("CAMFRIGO_NUVEM_LARGURA", 800))
+ALTURA = int(os.environ.get("CAMFRIGO_NUVEM_ALTURA", 400))
+MAX_PALAVRAS = int(os.environ.get("CAMFRIGO_NUVEM_MAX_PALAVRAS", 200))
+# Teto absoluto, independente do que for pedido pela interface
+LIMITE_PALAVRAS = 500
+LIMITE_PIXELS = 1600 * 800
+
+PASTA_CACHE = os.environ.get(
+    "CAMFRIGO_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+TAMANHO_CACHE_MEMORIA = 32
+TAMANHO_CACHE_DISCO = 512
+
+_memoria = OrderedDict()
+_trava = threading.Lock()
+estatisticas = {"acertos_memoria": 0, "acertos_disco": 0, "renderizacoes": 0}
+
+
+def _limitar(largura, altura, max_palavras):
+    """Aplica os tetos de palavras e de área, mantendo a proporção da tela."""
+    max_palavras = max(1, min(int(max_palavras), LIMITE_PALAVRAS))
+    area = largura * altura
+    if area > LIMITE_PIXELS:
+        escala = (LIMITE_PIXELS / area) ** 0.5
+        largura, altura = int(largura * escala), int(altura * escala)
+    return largura, altura, max_palavras
+
+
+def _impressao_digital(principais, parametros):
+    conteudo = json.dumps([principais, parametros], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+def _pasta_nuvens():
+    return os.path.join(PASTA_CACHE, "nuvens") if PASTA_CACHE else None
+
+
+def _ler_disco(chave):
+    pasta = _pasta_nuvens()
+    if not pasta:
+        return None
+    caminho = os.path.join(pasta, chave + ".png")
+    from PIL import Image
+    try:
+        with Image.open(caminho) as img:
+            imagem = np.asarray(img.convert("RGB"))
+        os.utime(caminho)  # marca como usada recentemente para a poda
+        return imagem
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_disco(chave, imagem):
+    pasta = _pasta_nuvens()
+    if not pasta:
+        return
+    from PIL import Image
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        temporario = os.path.join(pasta, chave + ".tmp")
+        Image.fromarray(imagem).save(temporario, format="PNG")
+        os.replace(temporario, os.path.join(pasta, chave + ".png"))
+        arquivos = [os.path.join(pasta, nome) for nome in os.listdir(pasta) if nome.endswith(".png")]
+        if len(arquivos) > TAMANHO_CACHE_DISCO:
+            arquivos.sort(key=os.path.getmtime)
+            for antigo in arquivos[:len(arquivos) - TAMANHO_CACHE_DISCO]:
+                os.remove(antigo)
+    except OSError:
+        pass  # pasta somente leitura: segue apenas com o cache em memória
+
+
+def renderizar_nuvem(frequencias, largura=LARGURA, altura=ALTURA, max_palavras=MAX_PALAVRAS,
+                     cor_fundo="white"):
+    """
+    Retorna a word cloud das frequências como array RGB (altura x largura x 3).
+    A imagem é determinística para as mesmas frequências e parâmetros.
+    """
+    largura, altura, max_palavras = _limitar(largura, altura, max_palavras)
+    # Só as palavras mais frequentes são desenhadas; o resto não entra na chave
+    principais = sorted(frequencias.items(), key=lambda item: (-item[1], item[0]))[:max_palavras]
+    parametros = {"largura": largura, "altura": altura, "max_palavras": max_palavras, "fundo": cor_fundo}
+    chave = _impressao_digital(principais, parametros)
+
+    with _trava:
+        imagem = _memoria.get(chave)
+        if imagem is not None:
+            _memoria.move_to_end(chave)
+            estatisticas["acertos_memoria"] += 1
+            return imagem
+
+    with etapa("Leitura do PNG em cache"):
+        imagem = _ler_disco(chave)
+    if imagem is not None:
+        estatisticas["acertos_disco"] += 1
+    else:
+        # Importado só quando há de fato uma nuvem a desenhar
+        with etapa("WordCloud"):
+            from wordcloud import WordCloud
+            nuvem = WordCloud(width=largura, height=altura, background_color=cor_fundo,
+                              max_words=max_palavras, random_state=0)
+            imagem = nuvem.generate_from_frequencies(dict(principais)).to_array()
+        estatisticas["renderizacoes"] += 1
+        with etapa("Gravação do PNG"):
+            _gravar_disco(chave, imagem)
+
+    imagem.setflags(write=False)
+    with _trava:
+        _memoria[chave] = imagem
+        _memoria.move_to_end(chave)
+        while len(_memoria) > TAMANHO_CACHE_MEMORIA:
+            _memoria.popitem(last=False)
+    return imagem
+
+
+def memoria_cache():
+    """(imagens, bytes) das word clouds mantidas no cache em memória."""
+    with _trava:
+        return len(_memoria), sum(imagem.nbytes for imagem in _memoria.values())
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Etapas de cálculo do dashboard, sem Streamlit.
+
+O script ST_DASH_PJT_CAMFRIGO.py só agenda estas funções e desenha os
+resultados; o benchmark (benchmarks/benchmark_pipeline.py) as chama
+sobre dados sintéticos, uma a uma e em conjunto por processar. Tudo o que é derivado de uma planilha
+fica em cache pela versão dela (agregacoes.em_cache); DataFrames sem versão
+(por exemplo, gerados em memória) são sempre recalculados.
+"""
+from agregacoes import agregar_resumo, agregar_servicos, em_cache
+from frequencias import STOPWORDS, frequencias_selecionadas, indexar_tokens
+from graficos import TOP_N_PIZZA, figuras_resumo, figuras_servicos
+
+
+def colunas_texto_problemas(df_problemas):
+    """
+    Colunas de texto das word clouds: a primeira que contenha
+    "problema"/"defeito" e a primeira que contenha "solucao"/"solucoes".
+    Retorna (col_def, col_sol), com None para a que não existir.
+    """
+    col_def = next((col for col in df_problemas.columns
+                    if "problema" in col.lower() or "defeito" in col.lower()), None)
+    col_sol = next((col for col in df_problemas.columns
+                    if "solucao" in col.lower() or "solucoes" in col.lower()), None)
+    return col_def, col_sol
+
+
+# As figuras ficam em cache pela versão da planilha e pelo número de fatias das
+# pizzas; enquanto nada disso muda, os reruns reaproveitam os mesmos objetos.
+def preparar_resumo(df, top_n=TOP_N_PIZZA):
+    """(agregados, (figuras, metricas)) da seção Resumo."""
+    agregados = agregar_resumo(df)
+    figuras = em_cache(df, ("figuras_resumo", top_n), lambda d: figuras_resumo(agregados, top_n))
+    return agregados, figuras
+
+
+def preparar_servicos(df, top_n=TOP_N_PIZZA):
+    """(agregados, (figuras, metricas)) da seção Serviços."""
+    agregados = agregar_servicos(df)
+    figuras = em_cache(df, ("figuras_servicos", top_n), lambda d: figuras_servicos(agregados, top_n))
+    return agregados, figuras
+
+
+def frequencias_problemas(df_problemas, coluna, selecionados=None):
+    """Frequências das palavras da coluna para as OMs selecionadas (todas se None), sem stopwords."""
+    return frequencias_selecionadas(indexar_tokens(df_problemas, coluna), selecionados, STOPWORDS)
+
+
+def processar(df_resumo, df_servicos, df_problemas, figuras=False):
+    """
+    Executa em sequência os cálculos das três seções sobre planilhas já
+    padronizadas: agregações do Resumo e dos Serviços, índices de palavras
+    e frequências das word clouds (todas as OMs). Com figuras=True também
+    constrói os gráficos plotly. Não renderiza as word clouds.
+    """
+    resultado = {}
+    if not df_resumo.empty and "solucao_proposta" in df_resumo.columns:
+        resultado["resumo"] = (preparar_resumo(df_resumo) if figuras
+                               else (agregar_resumo(df_resumo), None))
+    if not df_servicos.empty and "disciplina" in df_servicos.columns:
+        resultado["servicos"] = (preparar_servicos(df_servicos) if figuras
+                                 else (agregar_servicos(df_servicos), None))
+    resultado["frequencias"] = {
+        col: frequencias_problemas(df_problemas, col)
+        for col in colunas_texto_problemas(df_problemas) if col
+    }
+    return resultado
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Registro das campanhas de vistoria disponíveis.
+
+Uma campanha é o conjunto das planilhas
+TAB_VT_CAMFRIGO_<campanha>_{RESUMO,SERVICOS,PRINCIPAIS_PROBLEMAS}.xlsx de uma
+mesma pasta. A árvore de pastas é varrida para descobrir as campanhas (o
+resultado é reaproveitado por alguns segundos) e somente as planilhas das
+campanhas selecionadas são lidas, sob demanda, pelo cache de carregamento.
+
+Com mais de uma campanha selecionada, as planilhas de cada tipo são
+combinadas em um único DataFrame com a coluna "campanha" e a OM rotulada
+como "<campanha> | <om>", de modo que cada OM fica indexada por campanha.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import agregacoes
+from carregamento import carregar_planilha, compactar_tipos, visao
+
+PADRAO_ARQUIVO = re.compile(
+    r"^TAB_VT_CAMFRIGO_(?P<campanha>.+)_(?P<tipo>RESUMO|SERVICOS|PRINCIPAIS_PROBLEMAS)\.xlsx$",
+    re.IGNORECASE,
+)
+TIPOS = {"RESUMO": "resumo", "SERVICOS": "servicos", "PRINCIPAIS_PROBLEMAS": "problemas"}
+
+# Intervalo mínimo entre duas varreduras da mesma pasta
+TEMPO_REDESCOBERTA = 30.0
+# Combinações de várias campanhas mantidas em memória
+LIMITE_COMBINACOES = 8
+
+_descobertas = {}
+_combinacoes = OrderedDict()
+_trava = threading.Lock()
+
+
+def _varrer(raiz):
+    campanhas = {}
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        # Ignora pastas ocultas (.git, .cache etc.)
+        subpastas[:] = sorted(d for d in subpastas if not d.startswith("."))
+        relativa = os.path.relpath(pasta, raiz)
+        for arquivo in arquivos:
+            encontrado = PADRAO_ARQUIVO.match(arquivo)
+            if not encontrado:
+                continue
+            nome = encontrado.group("campanha")
+            campanha = nome if relativa == "." else f"{relativa.replace(os.sep, '/')}/{nome}"
+            tipo = TIPOS[encontrado.group("tipo").upper()]
+            campanhas.setdefault(campanha, {})[tipo] = os.path.join(pasta, arquivo)
+    return dict(sorted(campanhas.items()))
+
+
+def descobrir_campanhas(raiz, forcar=False):
+    """
+    Retorna {campanha: {"resumo": caminho, "servicos": caminho, "problemas": caminho}}
+    para as planilhas encontradas em `raiz` e subpastas. Tipos ausentes não
+    aparecem no dicionário da campanha.
+    """
+    raiz = os.path.abspath(raiz)
+    agora = time.monotonic()
+    with _trava:
+        anterior = _descobertas.get(raiz)
+    if not forcar and anterior is not None and agora - anterior[0] < TEMPO_REDESCOBERTA:
+        return anterior[1]
+    campanhas = _varrer(raiz)
+    with _trava:
+        _descobertas[raiz] = (agora, campanhas)
+    return campanhas
+
+
+def _combinar(partes):
+    """Concatena as planilhas de várias campanhas, em cache pelas versões de cada uma."""
+    chave = tuple((campanha, df.attrs.get("versao")) for campanha, df in partes)
+    with _trava:
+        if chave in _combinacoes:
+            _combinacoes.move_to_end(chave)
+            return _combinacoes[chave][0]
+
+    # Uma única cópia (o concat); "campanha" e "om" são montadas pelos códigos
+    # das categorias, sem gerar um texto por linha
+    nomes = [campanha for campanha, _ in partes]
+    combinado = pd.concat([df for _, df in partes], ignore_index=True)
+    if "om" in combinado.columns:
+        combinado["om"] = union_categoricals([_om_da_campanha(df, campanha) for campanha, df in partes])
+    combinado["campanha"] = pd.Categorical.from_codes(
+        np.repeat(np.arange(len(partes)), [len(df) for _, df in partes]), categories=nomes)
+    # Categóricas com categorias diferentes entre campanhas voltam como object no concat
+    compactar_tipos(combinado)
+    combinado.attrs = {
+        "versao": hashlib.sha1(repr(chave).encode("utf-8")).hexdigest(),
+        "valor_falhas": [],
+    }
+
+    n_bytes = int(combinado.memory_usage(deep=True).sum())
+    with _trava:
+        _combinacoes[chave] = (combinado, n_bytes)
+        while len(_combinacoes) > LIMITE_COMBINACOES:
+            _combinacoes.popitem(last=False)
+    return combinado
+
+
+def invalidar(versao):
+    """
+    Descarta as combinações que incluem a versão de planilha indicada e os
+    derivados delas (agregacoes.invalidar). Devolve quantas combinações saíram.
+    """
+    with _trava:
+        chaves = [chave for chave in _combinacoes if any(v == versao for _, v in chave)]
+        removidas = [_combinacoes.pop(chave)[0] for chave in chaves]
+    for combinado in removidas:
+        agregacoes.invalidar(combinado.attrs["versao"])
+    return len(removidas)
+
+
+def _om_da_campanha(df, campanha):
+    """Coluna "om" da planilha como categórica rotulada "<campanha> | <om>"."""
+    if "om" not in df.columns:
+        return pd.Categorical([None] * len(df))
+    om = df["om"]
+    if not isinstance(om.dtype, pd.CategoricalDtype):
+        om = om.astype(str).astype("category")
+    return om.cat.rename_categories([f"{campanha} | {c}" for c in om.cat.categories]).array
+
+
+def carregar_campanhas(campanhas, selecionadas, tipo):
+    """
+    Lê as planilhas do `tipo` ("resumo", "servicos" ou "problemas") das
+    campanhas selecionadas.
+
+    Retorna (df, relatorio): `df` é uma visão sem cópia (carregamento.visao)
+    da planilha única, quando há uma só campanha, ou da combinação de todas; `relatorio` traz, para cada
+    campanha, um dicionário com "campanha", "caminho", "acerto", "erro" e
+    "valor_falhas" para exibição de avisos.
+    """
+    partes = []
+    relatorio = []
+    for campanha in selecionadas:
+        caminho = campanhas.get(campanha, {}).get(tipo)
+        item = {"campanha": campanha, "caminho": caminho, "acerto": None, "erro": None, "valor_falhas": []}
+        relatorio.append(item)
+        if caminho is None:
+            continue
+        try:
+            df, item["acerto"] = carregar_planilha(caminho)
+        except Exception as e:
+            item["erro"] = e
+            continue
+        item["valor_falhas"] = df.attrs.get("valor_falhas", [])
+        if not df.empty:
+            partes.append((campanha, df))
+
+    if not partes:
+        return pd.DataFrame(), relatorio
+    if len(partes) == 1:
+        return visao(partes[0][1]), relatorio
+    return visao(_combinar(partes)), relatorio
+
+
+def memoria_combinacoes():
+    """(combinações, bytes) das combinações de campanhas mantidas em memória."""
+    with _trava:
+        return len(_combinacoes), sum(n_bytes for _, n_bytes in _combinacoes.values())
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshots colunares (Arrow/Feather) compilados a partir das planilhas Excel.
+
+Cada TAB_VT_CAMFRIGO_*.xlsx pode ser convertido em um arquivo .feather ao lado
+da planilha, já com as colunas padronizadas, "valor" em float64 e as colunas
+de baixa cardinalidade como categóricas. O snapshot é lido com memory-map e
+guarda nos metadados o SHA-1 da planilha de origem; só é usado enquanto esse
+hash conferir com o da planilha atual (o mtime não basta: uma cópia feita com
+cp -p, rsync -t ou sincronização em nuvem mantém o mtime antigo).
+
+Uso em lote (linha de comando):
+
+    python snapshots.py [pasta_ou_arquivo ...] [--forcar]
+"""
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow é opcional: sem ele o dashboard lê direto do Excel
+    pa = feather = None
+
+EXTENSAO_SNAPSHOT = ".feather"
+PADRAO_PLANILHAS = "TAB_VT_CAMFRIGO_*.xlsx"
+# Chave dos metadados do schema com o SHA-1 da planilha de origem
+CHAVE_ORIGEM = b"camfrigo_origem_sha1"
+
+
+def disponivel():
+    """Indica se o pyarrow está instalado para ler/gravar snapshots."""
+    return feather is not None
+
+
+def caminho_snapshot(caminho_xlsx):
+    return os.path.splitext(caminho_xlsx)[0] + EXTENSAO_SNAPSHOT
+
+
+def hash_arquivo(caminho):
+    """SHA-1 (hex) do conteúdo do arquivo."""
+    h = hashlib.sha1()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def hash_origem(caminho_xlsx):
+    """SHA-1 da planilha registrado no snapshot, ou None (sem snapshot ou sem o metadado)."""
+    try:
+        with pa.memory_map(caminho_snapshot(caminho_xlsx)) as arquivo:
+            metadados = pa.ipc.open_file(arquivo).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    origem = metadados.get(CHAVE_ORIGEM)
+    return origem.decode("ascii") if origem else None
+
+
+def snapshot_atualizado(caminho_xlsx, conteudo=None):
+    """
+    True se existe snapshot gerado a partir do conteúdo atual da planilha.
+    `conteudo` é o SHA-1 da planilha, quando já calculado pelo chamador.
+    """
+    if feather is None:
+        return False
+    origem = hash_origem(caminho_xlsx)
+    if origem is None:
+        return False
+    if conteudo is None:
+        try:
+            conteudo = hash_arquivo(caminho_xlsx)
+        except FileNotFoundError:
+            return False
+    return origem == conteudo
+
+
+def ler_snapshot(caminho_xlsx):
+    """Lê o snapshot da planilha via memory-map e devolve um DataFrame."""
+    tabela = feather.read_table(caminho_snapshot(caminho_xlsx), memory_map=True)
+    return tabela.to_pandas()
+
+
+def gravar_snapshot(df, caminho_xlsx, conteudo=None):
+    """
+    Grava o DataFrame já padronizado como snapshot Feather sem compressão
+    (necessário para o memory-map), com o SHA-1 da planilha (`conteudo`, ou
+    calculado aqui) nos metadados. A gravação é atômica: escreve em arquivo
+    temporário e renomeia.
+    """
+    if conteudo is None and os.path.exists(caminho_xlsx):
+        conteudo = hash_arquivo(caminho_xlsx)
+    tabela = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    if conteudo is not None:
+        tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}),
+                                                 CHAVE_ORIGEM: conteudo.encode("ascii")})
+    destino = caminho_snapshot(caminho_xlsx)
+    temporario = destino + ".tmp"
+    feather.write_feather(tabela, temporario, compression="uncompressed")
+    os.replace(temporario, destino)
+    return destino
+
+
+def _listar_planilhas(alvos):
+    planilhas = []
+    for alvo in alvos:
+        if os.path.isdir(alvo):
+            planilhas.extend(sorted(glob.glob(os.path.join(alvo, "**", PADRAO_PLANILHAS), recursive=True)))
+        else:
+            planilhas.append(alvo)
+    return planilhas
+
+
+def main(argv=None):
+    # Importação local para evitar ciclo (carregamento importa este módulo)
+    from carregamento import ler_planilha_excel
+
+    parser = argparse.ArgumentParser(description="Compila snapshots Feather das planilhas TAB_VT_CAMFRIGO_*.")
+    parser.add_argument("alvos", nargs="*", default=["."], help="Pastas ou arquivos .xlsx (padrão: pasta atual)")
+    parser.add_argument("--forcar", action="store_true", help="Recompila mesmo os snapshots atualizados")
+    args = parser.parse_args(argv)
+
+    if feather is None:
+        print("pyarrow não está instalado; não é possível gerar snapshots.", file=sys.stderr)
+        return 1
+
+    falhas = 0
+    for planilha in _listar_planilhas(args.alvos):
+        if not args.forcar and snapshot_atualizado(planilha):
+            print(f"[atualizado] {planilha}")
+            continue
+        inicio = time.perf_counter()
+        try:
+            destino = gravar_snapshot(ler_planilha_excel(planilha), planilha)
+        except Exception as e:
+            print(f"[erro] {planilha}: {e}", file=sys.stderr)
+            falhas += 1
+            continue
+        print(f"[gerado] {destino} ({time.perf_counter() - inicio:.2f}s)")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
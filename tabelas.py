@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Paginação e estilo das tabelas detalhadas.
+
+As tabelas de detalhe podem ter milhares de linhas. Em vez de enviar (e
+estilizar célula a célula) a planilha inteira, a ordenação é feita no
+servidor e só a página visível é recortada, renomeada e estilizada antes de
+ir para o st.dataframe. As funções não chamam o Streamlit.
+"""
+import math
+
+TAMANHOS_PAGINA = (25, 50, 100, 250)
+TAMANHO_PAGINA = 50
+
+# Cores da coluna ESTADO GERAL
+CORES_ESTADO = {
+    "Precário": "background-color: red; color: white",
+    "Bom": "background-color: green; color: white",
+    "Ruim": "background-color: yellow; color: black",
+}
+
+
+def total_paginas(n_linhas, tamanho):
+    return max(1, math.ceil(n_linhas / tamanho))
+
+
+def _ordem(serie, crescente):
+    """Posições das linhas ordenadas pela série (estável, vazios por último)."""
+    serie = serie.reset_index(drop=True)
+    try:
+        ordenada = serie.sort_values(ascending=crescente, na_position="last", kind="stable")
+    except TypeError:
+        # Coluna com tipos misturados: ordena pelo texto
+        texto = serie.astype(str).where(serie.notna())
+        ordenada = texto.sort_values(ascending=crescente, na_position="last", kind="stable")
+    return ordenada.index.to_numpy()
+
+
+def pagina(df, numero, tamanho=TAMANHO_PAGINA, ordenar_por=None, crescente=True, linhas=None):
+    """
+    Retorna as linhas da página `numero` (a partir de 1) do DataFrame,
+    ordenado por `ordenar_por` quando informado. `linhas`, quando informado,
+    é o array das posições que passaram no filtro: só elas são paginadas, sem
+    montar o DataFrame filtrado. Apenas as linhas da página são copiadas; o
+    índice original é preservado.
+    """
+    n_linhas = len(df) if linhas is None else len(linhas)
+    inicio = (min(max(numero, 1), total_paginas(n_linhas, tamanho)) - 1) * tamanho
+    fim = inicio + tamanho
+    if ordenar_por is None or ordenar_por not in df.columns:
+        return df.iloc[inicio:fim] if linhas is None else df.iloc[linhas[inicio:fim]]
+    if linhas is None:
+        return df.iloc[_ordem(df[ordenar_por], crescente)[inicio:fim]]
+    return df.iloc[linhas[_ordem(df[ordenar_por].iloc[linhas], crescente)[inicio:fim]]]
+
+
+def estilo_estado(coluna):
+    """Estilo CSS de uma coluna inteira de ESTADO GERAL, para Styler.apply."""
+    return coluna.astype(object).map(CORES_ESTADO).fillna("")
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Equivalência do índice de palavras (tokenizar, indexar_tokens e
+frequencias_selecionadas) com a tokenize_and_count original do dashboard.
+"""
+import re
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from carregamento import remover_acentos
+from frequencias import STOPWORDS, frequencias_selecionadas, indexar_tokens, tokenizar
+
+TEXTOS = [
+    "Compressor  com VAZAMENTO de gás!",
+    "Porta da câmara não veda; borracha ressecada.",
+    "Ação corretiva: troca do evaporador (urgente)",
+    "Ñandú, coração, pão e ÇÃO",
+    "Temperatura -18ºC / 0,5 kW\tok",
+    "  ",
+    "",
+    "já há o a e",
+    "naïve café crème brûlée",
+    "ﬁltro ½ ²",  # ligaduras e sinais de compatibilidade
+]
+
+
+def tokenize_and_count(series, stopwords):
+    """Cópia da função do ST_DASH_PJT_CAMFRIGO.py original, usada como referência."""
+    freq = {}
+    for text in series.dropna():
+        text = text.lower()
+        text = remover_acentos(text)
+        text = re.sub(r'[^a-z0-9\s]', '', text)
+        for word in text.split():
+            if word not in stopwords:
+                freq[word] = freq.get(word, 0) + 1
+    return freq
+
+
+@pytest.mark.parametrize("texto", TEXTOS)
+def test_tokenizar_equivale_ao_original(texto):
+    esperado = re.sub(r'[^a-z0-9\s]', '', remover_acentos(texto.lower())).split()
+    assert tokenizar(texto) == esperado
+
+
+def _problemas():
+    linhas = [(om, texto) for om in ("CMB", "8º B Sup", None) for texto in TEXTOS]
+    linhas += [("CMB", None), ("Ba Adm", TEXTOS[0]), ("Ba Adm", TEXTOS[0])]
+    return pd.DataFrame(linhas, columns=["om", "problema"])
+
+
+def test_frequencias_de_todas_as_oms():
+    df = _problemas()
+    indice = indexar_tokens(df, "problema")
+    assert frequencias_selecionadas(indice, None, STOPWORDS) == tokenize_and_count(df["problema"], STOPWORDS)
+
+
+@pytest.mark.parametrize("selecionados", [["CMB"], ["CMB", "Ba Adm"], ["inexistente"], []])
+def test_frequencias_das_oms_selecionadas(selecionados):
+    df = _problemas()
+    indice = indexar_tokens(df, "problema")
+    esperado = tokenize_and_count(df.loc[df["om"].isin(selecionados), "problema"], STOPWORDS)
+    assert frequencias_selecionadas(indice, selecionados, STOPWORDS) == esperado
+
+
+def test_contagens_sem_stopwords():
+    df = _problemas()
+    indice = indexar_tokens(df, "problema")
+    total = Counter()
+    for contagem in indice.values():
+        total.update(contagem)
+    assert frequencias_selecionadas(indice) == dict(total)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Equivalência de converter_valores_para_numero (vetorizada) com
+converter_valor_para_numero aplicada linha a linha.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import carregamento
+from carregamento import converter_valor_para_numero, converter_valores_para_numero
+
+CASOS_DE_BORDA = [
+    "R$ 1.234,56", "R$1.234,56", "  R$ 0,99 ", "1.234.567,89", "-R$ 5,00", "R$ -5,00", "12",
+    "nan", "inf", "1_000", "1e3", "", "   ", "abc", "R$", "1,2,3",
+    0, 7, 3.25, float("nan"), True, None, np.float64(2.5), np.int64(3), pd.Timestamp("2024-01-01"),
+    # "R$" e pontos em posições incomuns; espaços que o strip() remove e o float() não
+    "R.$ 5", "RR$$5", "R$R$1", "5R$", "1-2", ".", "e5", "+,5", "1.e5", "R$ 1,5e3",
+    "\x1c \x1c.1.234,56", " .\x1c5", "\x85,5", " 1,5 ", "1 2",
+    # dígitos e números que só o float() do Python aceita
+    "١٢", "½", "1e400", "0x1", "infinity", "-nan",
+]
+# Linhas que a função por linha zera sem conseguir interpretar
+FALHAS = {"-R$ 5,00", "", "   ", "abc", "R$", "1,2,3", "R.$ 5", "RR$$5", "1-2", ".", "e5",
+          " .\x1c5", "1 2", "½", "0x1"}
+
+
+@pytest.fixture(params=["arrow", "arrow_em_blocos", "python"])
+def caminho(request, monkeypatch):
+    """Os três caminhos de conversão dos textos: Arrow, Arrow em blocos minúsculos e sem pyarrow."""
+    if request.param == "arrow" and carregamento.pc is None:
+        pytest.skip("pyarrow não instalado")
+    if request.param == "arrow_em_blocos":
+        if carregamento.pc is None:
+            pytest.skip("pyarrow não instalado")
+        monkeypatch.setattr(carregamento, "BLOCO_TEXTOS", 3)
+    if request.param == "python":
+        monkeypatch.setattr(carregamento, "pc", None)
+    return request.param
+
+
+def _esperado(serie):
+    return serie.apply(converter_valor_para_numero).astype("float64")
+
+
+@pytest.mark.parametrize("valor", CASOS_DE_BORDA, ids=repr)
+def test_caso_de_borda(caminho, valor):
+    serie = pd.Series([valor], dtype=object)
+    obtido, falhas = converter_valores_para_numero(serie)
+    pd.testing.assert_series_equal(obtido, _esperado(serie))
+    assert bool(falhas.iloc[0]) == (isinstance(valor, str) and valor in FALHAS
+                                    or isinstance(valor, (np.int64, pd.Timestamp)))
+
+
+def test_todos_os_casos_juntos(caminho):
+    # Juntos, os textos dividem o mesmo buffer do Arrow (e os mesmos blocos)
+    serie = pd.Series(CASOS_DE_BORDA * 3, index=range(100, 100 + 3 * len(CASOS_DE_BORDA)), dtype=object)
+    obtido, falhas = converter_valores_para_numero(serie)
+    pd.testing.assert_series_equal(obtido, _esperado(serie))
+    assert falhas.index.equals(serie.index)
+
+
+def test_so_textos(caminho):
+    serie = pd.Series(["R$ 1.234,56", None, "R$ 0,01", "", "a definir", "R$ 10"], dtype=object)
+    obtido, falhas = converter_valores_para_numero(serie)
+    pd.testing.assert_series_equal(obtido, _esperado(serie))
+    assert falhas.tolist() == [False, False, False, True, True, False]
+
+
+def test_coluna_numerica():
+    serie = pd.Series([1, 2, 3], dtype="int64")
+    obtido, falhas = converter_valores_para_numero(serie)
+    assert obtido.dtype == "float64" and obtido.tolist() == [1.0, 2.0, 3.0]
+    assert not falhas.any()
+
+
+def test_serie_vazia(caminho):
+    obtido, falhas = converter_valores_para_numero(pd.Series([], dtype=object))
+    assert len(obtido) == 0 and len(falhas) == 0
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Recarga automática das planilhas alteradas na pasta de dados.
+
+Uma thread por pasta (iniciar) confere periodicamente a assinatura (mtime +
+tamanho) de cada TAB_VT_CAMFRIGO_*.xlsx da árvore. Quando uma planilha já
+lida por alguma sessão muda, só ela é relida pelo cache de carregamento,
+ainda em segundo plano; se o conteúdo de fato mudou, os resultados derivados
+da versão anterior (agregados, figuras, índices de palavras e combinações de
+campanhas que a incluíam) são descartados. As demais planilhas e tudo o que deriva delas continuam em cache:
+uma atualização dos PRINCIPAIS_PROBLEMAS não recalcula Resumo nem Serviços.
+As word clouds são indexadas pelas frequências e não por planilha; as antigas
+apenas saem do cache LRU com o tempo.
+
+Depois da recarga o callback `ao_alterar` é chamado com a lista de
+alterações; no dashboard, reexecutar_sessoes pede um rerun a todas as
+sessões abertas, que encontram a planilha nova já em cache.
+
+Configuração por variáveis de ambiente:
+  CAMFRIGO_VIGIAR            "0" desativa a vigilância no dashboard
+  CAMFRIGO_VIGIAR_INTERVALO  segundos entre duas verificações (padrão 2)
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import agregacoes
+import carregamento
+import registro
+
+ATIVA = os.environ.get("CAMFRIGO_VIGIAR", "1") != "0"
+INTERVALO = float(os.environ.get("CAMFRIGO_VIGIAR_INTERVALO", 2.0))
+LIMITE_ALTERACOES = 50
+
+# raiz -> thread de vigilância
+_vigias = {}
+_trava = threading.Lock()
+# Últimas alterações processadas, de todas as pastas: {"instante", "caminho", "evento", "tempo"}
+_alteracoes = deque(maxlen=LIMITE_ALTERACOES)
+
+
+def assinaturas(raiz):
+    """{caminho: (mtime_ns, tamanho)} das planilhas de campanha encontradas em `raiz`."""
+    resultado = {}
+    for tipos in registro.descobrir_campanhas(raiz, forcar=True).values():
+        for caminho in tipos.values():
+            try:
+                info = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            resultado[caminho] = (info.st_mtime_ns, info.st_size)
+    return resultado
+
+
+def comparar(anteriores, atuais):
+    """Lista de (caminho, evento) com evento "nova", "alterada" ou "removida"."""
+    alteracoes = [(caminho, "nova" if caminho not in anteriores else "alterada")
+                  for caminho, assinatura in atuais.items() if anteriores.get(caminho) != assinatura]
+    alteracoes += [(caminho, "removida") for caminho in anteriores if caminho not in atuais]
+    return alteracoes
+
+
+def recarregar(caminho, evento):
+    """
+    Relê (ou descarta, se removida) uma única planilha já em cache e
+    invalida o que derivava da versão anterior. Devolve True se as sessões
+    precisam ser atualizadas (conteúdo novo ou lista de campanhas alterada).
+    """
+    inicio = time.perf_counter()
+    versao_anterior = carregamento.versao_em_cache(caminho)
+    if evento == "removida":
+        carregamento.descartar(caminho)
+        mudou = True  # a campanha pode ter saído da lista
+    elif versao_anterior is None:
+        # Nenhuma sessão leu esta planilha: nada a reler; uma planilha nova só muda a lista de campanhas
+        mudou = evento == "nova"
+    else:
+        df, _ = carregamento.carregar_planilha(caminho)
+        # Arquivo apenas "tocado": o hash confere e o cache segue valendo
+        mudou = df.attrs.get("versao") != versao_anterior
+    if mudou and versao_anterior is not None:
+        agregacoes.invalidar(versao_anterior)
+        registro.invalidar(versao_anterior)
+    if mudou:
+        with _trava:
+            _alteracoes.append({"instante": time.time(), "caminho": caminho, "evento": evento,
+                                "tempo": time.perf_counter() - inicio})
+    return mudou
+
+
+def alteracoes_recentes(desde=None):
+    """Alterações processadas (mais recentes por último), opcionalmente só as posteriores a `desde`."""
+    with _trava:
+        return [a for a in _alteracoes if desde is None or a["instante"] > desde]
+
+
+def _vigiar(raiz, intervalo, ao_alterar):
+    anteriores = assinaturas(raiz)
+    while True:
+        time.sleep(intervalo)
+        try:
+            atuais = assinaturas(raiz)
+            alteradas = []
+            for caminho, evento in comparar(anteriores, atuais):
+                try:
+                    if recarregar(caminho, evento):
+                        alteradas.append((caminho, evento))
+                except Exception:
+                    # Planilha ainda sendo gravada ou inválida: tenta de novo no próximo ciclo
+                    if caminho in anteriores:
+                        atuais[caminho] = anteriores[caminho]
+                    else:
+                        atuais.pop(caminho, None)
+            anteriores = atuais
+            if alteradas and ao_alterar is not None:
+                ao_alterar(alteradas)
+        except Exception:
+            continue  # pasta temporariamente inacessível: tenta de novo no próximo ciclo
+
+
+def iniciar(raiz, intervalo=INTERVALO, ao_alterar=None):
+    """
+    Inicia (uma única vez por pasta e por processo) a thread que vigia as
+    planilhas de `raiz`. Chamadas seguintes para a mesma pasta não fazem nada.
+    """
+    raiz = os.path.abspath(raiz)
+    with _trava:
+        if raiz in _vigias:
+            return _vigias[raiz]
+        vigia = threading.Thread(target=_vigiar, args=(raiz, intervalo, ao_alterar),
+                                 name=f"camfrigo-vigia-{os.path.basename(raiz)}", daemon=True)
+        _vigias[raiz] = vigia
+    vigia.start()
+    return vigia
+
+
+def reexecutar_sessoes(alteracoes=None):
+    """
+    Pede um rerun a todas as sessões abertas do Streamlit, com o estado dos
+    widgets de cada uma (como o próprio Streamlit faz ao salvar o script).
+    Usa a API interna do runtime; se ela não existir, as sessões só veem os
+    dados novos no próximo rerun. Devolve o número de sessões avisadas.
+    """
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return 0
+        sessoes = Runtime.instance()._session_mgr.list_active_sessions()
+    except Exception:
+        return 0
+    avisadas = 0
+    for info in sessoes:
+        try:
+            info.session.request_rerun(getattr(info.session, "_client_state", None))
+            avisadas += 1
+        except Exception:
+            continue
+    return avisadas